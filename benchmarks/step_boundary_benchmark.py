@@ -0,0 +1,153 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from zenml.artifact_stores import LocalArtifactStore, LocalArtifactStoreConfig
+from zenml.enums import StackComponentType
+from zenml.integrations.pandas.materializers.pandas_materializer import PandasMaterializer
+
+from materializers.stock_data_materializer import StockDataMaterializer
+
+"""
+Benchmark of the cost of passing stock data across a ZenML step boundary.
+
+Every DataFrame a step returns is saved once, and loaded again by every step that
+consumes it. This script times that save and load for ZenML's default
+PandasMaterializer (gzip Parquet) and for the StockDataMaterializer (memory-mapped
+Arrow IPC), reports the artifact size, and scales the timings by the number of
+saves and loads in the unfused pipeline.
+
+Usage:
+    python benchmarks/step_boundary_benchmark.py --rows 2000000 --repeat 5
+"""
+
+
+def count_step_boundaries() -> tuple:
+    """
+    Counts the DataFrame artifacts passed between the steps of the unfused pipeline for one ticker.
+
+    Returns:
+        tuple: Number of DataFrame outputs that are consumed (saves) and number of
+        DataFrame inputs (loads).
+    """
+    from pipelines.run_pipeline import run_pipeline
+    from utils.config import BENCHMARK_TICKER_SYMBOL
+
+    # A universe of only the benchmark, so the counts are per ticker
+    run_pipeline.prepare(ticker_symbols=[BENCHMARK_TICKER_SYMBOL], fuse_steps=False)
+    invocations = run_pipeline.invocations
+    saved, loads = set(), 0
+    for invocation in invocations.values():
+        for artifact in invocation.input_artifacts.values():
+            producer = invocations[artifact.invocation_id].step
+            output = producer.entrypoint_definition.outputs[artifact.output_name]
+            if output.resolved_annotation is pd.DataFrame:
+                saved.add((artifact.invocation_id, artifact.output_name))
+                loads += 1
+    return len(saved), loads
+
+
+def make_stock_data(rows: int) -> pd.DataFrame:
+    """
+    Builds a synthetic frame shaped like the output of the feature engineering step.
+
+    Args:
+        rows (int): Number of rows to generate.
+
+    Returns:
+        pd.DataFrame: Random OHLCV and feature columns indexed by date.
+    """
+    rng = np.random.default_rng(0)
+    index = pd.date_range("1980-01-01", periods=rows, freq="min", name="Date")
+    columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Return', 'Volatility', 'Moving Average']
+    return pd.DataFrame(rng.random((rows, len(columns))), index=index, columns=columns)
+
+
+def make_artifact_store(path: str) -> LocalArtifactStore:
+    """
+    Creates a standalone local artifact store rooted at the given path.
+
+    Args:
+        path (str): Root directory of the artifact store.
+
+    Returns:
+        LocalArtifactStore: The artifact store.
+    """
+    now = datetime.now()
+    return LocalArtifactStore(
+        name="benchmark",
+        id=uuid.uuid4(),
+        config=LocalArtifactStoreConfig(path=path),
+        flavor="local",
+        type=StackComponentType.ARTIFACT_STORE,
+        user=None,
+        created=now,
+        updated=now,
+    )
+
+
+def time_round_trip(materializer_class, stock_data: pd.DataFrame, root: str, repeat: int):
+    """
+    Times save + load of the stock data with the given materializer.
+
+    Args:
+        materializer_class: The materializer class to benchmark.
+        stock_data (pd.DataFrame): The data to round trip.
+        root (str): Directory in which artifacts are written.
+        repeat (int): Number of round trips to time.
+
+    Returns:
+        tuple: Best save time, best load time (seconds) and artifact size (bytes).
+    """
+    artifact_store = make_artifact_store(root)
+    save_times, load_times = [], []
+    for i in range(repeat):
+        uri = os.path.join(root, f"{materializer_class.__name__}_{i}")
+        os.makedirs(uri, exist_ok=True)
+        materializer = materializer_class(uri, artifact_store=artifact_store)
+
+        start = time.perf_counter()
+        materializer.save(stock_data)
+        save_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        loaded = materializer.load(pd.DataFrame)
+        # Touch every column so lazily mapped pages are actually read
+        loaded.sum()
+        load_times.append(time.perf_counter() - start)
+
+    size = sum(os.path.getsize(os.path.join(uri, f)) for f in os.listdir(uri))
+    return min(save_times), min(load_times), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    saves, loads = count_step_boundaries()
+    stock_data = make_stock_data(args.rows)
+    print(f"unfused pipeline: {saves} DataFrame saves, {loads} loads")
+    print(f"rows={args.rows} in-memory={stock_data.memory_usage().sum() / 1e6:.1f} MB")
+    print(f"{'materializer':<24}{'save s':>10}{'load s':>10}{'size MB':>10}{'pipeline s':>12}")
+    with tempfile.TemporaryDirectory() as root:
+        for materializer_class in (PandasMaterializer, StockDataMaterializer):
+            save, load, size = time_round_trip(materializer_class, stock_data, root, args.repeat)
+            print(
+                f"{materializer_class.__name__:<24}{save:>10.3f}{load:>10.3f}"
+                f"{size / 1e6:>10.1f}{save * saves + load * loads:>12.3f}"
+            )
+    print("fused process_stock_data_step: 0 boundaries, no artifact overhead")
+
+
+if __name__ == "__main__":
+    main()
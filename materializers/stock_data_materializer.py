@@ -0,0 +1,147 @@
+import hashlib
+import os
+from typing import Any, ClassVar, Optional, Tuple, Type
+
+import pandas as pd
+import pyarrow as pa
+from zenml.enums import ArtifactType
+from zenml.materializers.base_materializer import BaseMaterializer
+
+"""
+Here we are using an Arrow IPC file as the on-disk format for stock data frames
+passed between pipeline steps. The file is written uncompressed so that it can be
+memory-mapped on read instead of being decompressed and copied.
+"""
+
+ARROW_FILENAME = "stock_data.arrow"
+
+
+class StockDataMaterializer(BaseMaterializer):
+    """
+    Materializer that stores stock data DataFrames as Arrow IPC files.
+
+    Methods:
+    ----------
+    save(stock_data: pd.DataFrame) -> None:
+        Writes the DataFrame (including its date index) to an Arrow IPC file.
+
+    load(data_type: Type[Any]) -> pd.DataFrame:
+        Reads the DataFrame back, memory-mapping the file when the artifact store is local.
+
+    compute_content_hash(stock_data: pd.DataFrame) -> str:
+        Hashes the columns, index and values so identical frames share cache entries.
+    """
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (pd.DataFrame,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+
+    @property
+    def arrow_path(self) -> str:
+        """
+        Path of the Arrow IPC file inside the artifact URI.
+
+        Returns:
+            str: The full path of the Arrow file.
+        """
+        return os.path.join(self.uri, ARROW_FILENAME)
+
+    def _is_local(self) -> bool:
+        """
+        Checks whether the artifact URI points to the local filesystem.
+
+        Returns:
+            bool: True if the file can be opened and memory-mapped directly.
+        """
+        return "://" not in self.uri
+
+    def save(self, stock_data: pd.DataFrame) -> None:
+        """
+        Writes the stock data to an uncompressed Arrow IPC file.
+
+        Args:
+            stock_data (pd.DataFrame): The stock data to store.
+        """
+        table = self._to_table(stock_data)
+        if self._is_local():
+            os.makedirs(self.uri, exist_ok=True)
+            with pa.OSFile(self.arrow_path, "wb") as sink:
+                self._write_table(sink, table)
+        else:
+            with self.artifact_store.open(self.arrow_path, mode="wb") as f:
+                self._write_table(f, table)
+
+    def load(self, data_type: Type[Any]) -> pd.DataFrame:
+        """
+        Reads the stock data from the Arrow IPC file.
+
+        On a local artifact store the file is memory-mapped, so numeric columns
+        without nulls are handed to pandas without copying. The file handle is
+        closed after reading, the mapping itself stays alive for as long as the
+        returned columns reference it.
+
+        Args:
+            data_type (Type[Any]): The type the artifact should be loaded as.
+
+        Returns:
+            pd.DataFrame: The stored stock data.
+        """
+        if self._is_local():
+            with pa.memory_map(self.arrow_path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+        else:
+            with self.artifact_store.open(self.arrow_path, mode="rb") as f:
+                table = pa.ipc.open_file(pa.py_buffer(f.read())).read_all()
+        return table.to_pandas(split_blocks=True)
+
+    def compute_content_hash(self, stock_data: pd.DataFrame) -> Optional[str]:
+        """
+        Computes a hash of the stock data content.
+
+        ZenML includes this hash in the cache key of downstream steps, so a step
+        receiving the same data as a previous run (e.g. an empty frame when no new
+        bars exist) is served from the cache.
+
+        Args:
+            stock_data (pd.DataFrame): The stock data to hash.
+
+        Returns:
+            str: The hex digest of the column names, index and row hashes.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(repr(list(stock_data.columns)).encode())
+        hasher.update(pd.util.hash_pandas_object(stock_data, index=True).values.tobytes())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _to_table(stock_data: pd.DataFrame) -> pa.Table:
+        """
+        Converts the stock data to an Arrow table, keeping NaN as a float value.
+
+        pa.Table.from_pandas turns NaN into nulls, and a column with nulls has to be copied
+        when it is read back. Float columns are therefore converted without the pandas null
+        semantics, so features with leading NaNs are memory-mapped like every other column.
+
+        Args:
+            stock_data (pd.DataFrame): The stock data to convert.
+
+        Returns:
+            pa.Table: The table, with the pandas metadata needed to restore index and columns.
+        """
+        table = pa.Table.from_pandas(stock_data, preserve_index=True)
+        # from_pandas puts the data columns first, in the order of the frame
+        for i in range(stock_data.shape[1]):
+            values = stock_data.iloc[:, i].to_numpy()
+            if values.dtype.kind == 'f':
+                table = table.set_column(i, table.schema.field(i), pa.array(values, from_pandas=False))
+        return table
+
+    @staticmethod
+    def _write_table(sink: Any, table: pa.Table) -> None:
+        """
+        Writes an Arrow table to an open sink in the IPC file format.
+
+        Args:
+            sink (Any): An open, writable file or Arrow output stream.
+            table (pa.Table): The table to write.
+        """
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
@@ -1,21 +1,49 @@
 import sys
 sys.path.append('/Users/mdayanarshad/Desktop/Data_Science_Projects/HFT_RealTime_DataPipeline')
 
+from typing import Dict, List
+
 # Correct imports for the decorators
 from zenml import pipeline
 from zenml.steps import step
+from utils.config import TICKER_SYMBOLS, BENCHMARK_TICKER_SYMBOL, TICKER_SECTORS
+from steps.compute_cache_key_step import compute_cache_key_step
 from steps.ingest_data_step import ingest_data_step
+from steps.validate_data_step import validate_data_step
 from steps.handle_missing_value_step import handle_missing_value_step
 from steps.feature_engineering_step import feature_engineering_step
 from steps.storing_preprocessed_data_step import storing_preprocessed_data_step
+from steps.process_stock_data_step import process_stock_data_step
+from steps.rollup_step import rollup_step
+from steps.cross_sectional_features_step import cross_sectional_features_step
 
 @pipeline
-def run_pipeline():
-    ticker_symbol = "AAPL"
-    stock_data = ingest_data_step(ticker_symbol=ticker_symbol)
-    stock_data = handle_missing_value_step(stock_data)
-    stock_data = feature_engineering_step(stock_data)
-    storing_preprocessed_data_step(stock_data, ticker_symbol)
+def run_pipeline(
+    ticker_symbols: List[str] = TICKER_SYMBOLS,
+    benchmark_symbol: str = BENCHMARK_TICKER_SYMBOL,
+    sectors: Dict[str, str] = TICKER_SECTORS,
+    fuse_steps: bool = False,
+):
+    # The benchmark is ingested like any other ticker, the cross-sectional features need it
+    universe = list(dict.fromkeys([*ticker_symbols, benchmark_symbol]))
+    stored = []
+    for ticker_symbol in universe:
+        # Changes only when new bars can exist, so unchanged tickers hit the step cache
+        cache_key = compute_cache_key_step(ticker_symbol=ticker_symbol, id=f"compute_cache_key_step_{ticker_symbol}")
+        if fuse_steps:
+            # Single step, no intermediate artifacts are materialized
+            stored.append(f"process_stock_data_step_{ticker_symbol}")
+            process_stock_data_step(ticker_symbol=ticker_symbol, cache_key=cache_key, id=stored[-1])
+            continue
+        stock_data = ingest_data_step(ticker_symbol=ticker_symbol, cache_key=cache_key, id=f"ingest_data_step_{ticker_symbol}")
+        stock_data = validate_data_step(stock_data, ticker_symbol, id=f"validate_data_step_{ticker_symbol}")
+        stock_data = handle_missing_value_step(stock_data, id=f"handle_missing_value_step_{ticker_symbol}")
+        stock_data = feature_engineering_step(stock_data, ticker_symbol, id=f"feature_engineering_step_{ticker_symbol}")
+        stored.append(f"storing_preprocessed_data_step_{ticker_symbol}")
+        storing_preprocessed_data_step(stock_data, ticker_symbol, id=stored[-1])
+        rollup_step(stock_data, ticker_symbol, id=f"rollup_step_{ticker_symbol}", after=stored[-1])
+    # Runs once on the whole stored universe, so it has to wait for every ticker
+    cross_sectional_features_step(ticker_symbols=universe, benchmark_symbol=benchmark_symbol, sectors=sectors, after=stored)
 
 if __name__ == "__main__":
     run_pipeline()
@@ -0,0 +1,465 @@
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config import DB_PARAMS, TICKER_SYMBOLS, BENCHMARK_TICKER_SYMBOL
+from utils.logger import logger
+
+"""
+Here I am using template design pattern for Cross-Sectional Feature Engineering.
+Features are computed on an aligned dates x tickers return matrix with NumPy matrix
+operations, and only for the dates that are not stored yet.
+"""
+
+CROSS_SECTIONAL_FEATURES = [
+    'Beta',
+    'Average Correlation',
+    'Correlation Cluster',
+    'Relative Return',
+    'Sector Relative Return',
+    'Return Rank',
+]
+
+
+class CrossSectionalFeatureEngineer:
+    """
+    A class for cross-sectional feature engineering of a universe of stocks.
+
+    Attributes:
+    -----------
+    window (int): Number of dates in the rolling window for beta and correlation.
+    min_periods (int): Minimum number of valid returns in the window for a ticker to get beta and correlation features.
+    cluster_threshold (float): Two tickers are linked into the same cluster if their correlation is at least this value.
+    sectors (dict): Optional mapping of ticker symbol to sector, used for sector relative returns.
+
+    Methods
+    -------
+    engineer(returns : pd.DataFrame, benchmark_symbol : str, start_date, end_date) -> pd.DataFrame
+        public method for cross-sectional feature engineering
+
+    _rolling_beta(returns : np.ndarray, benchmark : np.ndarray) -> np.ndarray
+        private method for the rolling beta of every ticker against the benchmark
+
+    _rolling_correlation(returns : np.ndarray, first_row : int) -> tuple
+        private method for the average correlation and correlation cluster of every ticker
+    """
+
+    def __init__(self, window: int = 60, min_periods: int = 40, cluster_threshold: float = 0.7, sectors: dict = None) -> None:
+        """
+        Initializes the CrossSectionalFeatureEngineer.
+
+        Args:
+            window (int): Number of dates in the rolling window.
+            min_periods (int): Minimum number of valid returns in the window.
+            cluster_threshold (float): Correlation at which two tickers are linked into one cluster.
+            sectors (dict): Optional mapping of ticker symbol to sector.
+        """
+        self.window = window
+        self.min_periods = min_periods
+        self.cluster_threshold = cluster_threshold
+        self.sectors = sectors or {}
+
+    def engineer(self, returns: pd.DataFrame, benchmark_symbol: str = BENCHMARK_TICKER_SYMBOL, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Public method for cross-sectional feature engineering.
+
+        Parameters:
+        ----------
+        returns : pd.DataFrame
+            Daily returns with one row per date and one column per ticker symbol. Must contain the
+            benchmark column and, for incremental runs, at least `window` dates before start_date.
+        benchmark_symbol : str
+            Ticker symbol of the benchmark the betas and relative returns are computed against.
+        start_date : date, optional
+            First date to compute features for. Earlier rows are only used as lookback.
+        end_date : date, optional
+            Last date to compute features for, later rows are ignored. Set it to the last date
+            the whole universe is stored for, so that no date is computed on a partial universe.
+
+        Returns:
+        -------
+        features : pd.DataFrame
+            One row per (Date, ticker_symbol) from start_date to end_date, with the columns in CROSS_SECTIONAL_FEATURES.
+
+        Raises:
+        -------
+        ValueError
+            If the benchmark is not one of the columns of returns.
+        """
+        logger.info("Cross-Sectional Feature Engineering started")
+        if benchmark_symbol not in returns.columns:
+            raise ValueError(f"Benchmark {benchmark_symbol} is missing from the return matrix")
+        returns = returns.sort_index()
+        if end_date is not None:
+            returns = returns.loc[:pd.Timestamp(end_date)]
+        first_row = 0 if start_date is None else int(returns.index.searchsorted(pd.Timestamp(start_date)))
+        tickers = returns.columns.drop(benchmark_symbol)
+        if first_row >= len(returns) or tickers.empty:
+            logger.info("No new dates for Cross-Sectional Feature Engineering")
+            return pd.DataFrame(columns=CROSS_SECTIONAL_FEATURES, index=pd.MultiIndex.from_arrays([[], []], names=['Date', 'ticker_symbol']))
+
+        stock_returns = returns[tickers].to_numpy(dtype='float64')
+        benchmark = returns[benchmark_symbol].to_numpy(dtype='float64')
+
+        beta = self._rolling_beta(stock_returns, benchmark)[first_row:]
+        average_correlation, cluster = self._rolling_correlation(stock_returns, first_row)
+        new_returns = stock_returns[first_row:]
+        relative_return = new_returns - benchmark[first_row:, None]
+        sector_relative_return = self._sector_relative_return(new_returns, tickers)
+        return_rank = pd.DataFrame(new_returns).rank(axis=1, pct=True).to_numpy()
+
+        # Column order of the stacked matrices follows CROSS_SECTIONAL_FEATURES
+        index = pd.MultiIndex.from_product([returns.index[first_row:], tickers], names=['Date', 'ticker_symbol'])
+        features = pd.DataFrame({
+            'Beta': beta.ravel(),
+            'Average Correlation': average_correlation.ravel(),
+            'Correlation Cluster': np.asarray(tickers, dtype=object)[cluster.ravel()],
+            'Relative Return': relative_return.ravel(),
+            'Sector Relative Return': sector_relative_return.ravel(),
+            'Return Rank': return_rank.ravel(),
+        }, index=index)
+
+        # Tickers without a return on a date (not listed yet or delisted) get no row
+        features = features[~np.isnan(new_returns).ravel()]
+        logger.info(f"Cross-Sectional Feature Engineering completed for {len(returns) - first_row} dates and {len(tickers)} tickers")
+        return features
+
+    def _rolling_beta(self, returns: np.ndarray, benchmark: np.ndarray) -> np.ndarray:
+        """
+        private method to compute the rolling beta of every ticker against the benchmark.
+
+        Window sums are taken from cumulative sums over the whole matrix, so the cost is
+        linear in the number of dates and tickers regardless of the window length.
+
+        Parameters:
+        ----------
+        returns : np.ndarray
+            (dates x tickers) returns, NaN where a ticker has no return.
+        benchmark : np.ndarray
+            Benchmark returns aligned with the rows of returns.
+
+        Returns:
+        -------
+        beta : np.ndarray
+            (dates x tickers) rolling beta, NaN where fewer than min_periods pairs are available.
+        """
+        valid = ~np.isnan(returns) & ~np.isnan(benchmark)[:, None]
+        x = np.where(valid, returns, 0.0)
+        y = np.where(valid, benchmark[:, None], 0.0)
+
+        def window_sum(values):
+            cumulative = np.cumsum(values, axis=0)
+            cumulative[self.window:] = cumulative[self.window:] - cumulative[:-self.window]
+            return cumulative
+
+        count = window_sum(valid.astype('float64'))
+        sum_x, sum_y = window_sum(x), window_sum(y)
+        sum_xy, sum_yy = window_sum(x * y), window_sum(y * y)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = sum_xy - sum_x * sum_y / count
+            variance = sum_yy - sum_y * sum_y / count
+            beta = covariance / variance
+        beta[(count < self.min_periods) | (variance <= 0)] = np.nan
+        return beta
+
+    def _rolling_correlation(self, returns: np.ndarray, first_row: int) -> tuple:
+        """
+        private method to compute the average correlation and correlation cluster of every ticker.
+
+        The (tickers x tickers) sums of products over the window are built once with a matrix
+        product and then rolled forward one date at a time by adding the outer product of the
+        new row and subtracting the one leaving the window. They are rebuilt every `window`
+        dates to keep rounding errors from accumulating. Missing returns count as zero.
+
+        Parameters:
+        ----------
+        returns : np.ndarray
+            (dates x tickers) returns, NaN where a ticker has no return.
+        first_row : int
+            First row to compute the features for.
+
+        Returns:
+        -------
+        tuple
+            (average_correlation, cluster), both (new dates x tickers). cluster holds the column
+            index of the first ticker in each cluster, tickers without enough data form their own cluster.
+        """
+        n_dates, n_tickers = returns.shape
+        valid = ~np.isnan(returns)
+        x = np.where(valid, returns, 0.0)
+        valid_count = np.cumsum(valid, axis=0)
+
+        average_correlation = np.full((n_dates - first_row, n_tickers), np.nan)
+        cluster = np.empty((n_dates - first_row, n_tickers), dtype=np.int64)
+        sum_products = sum_x = None
+        for row in range(first_row, n_dates):
+            start = max(0, row - self.window + 1)
+            if (row - first_row) % self.window == 0:
+                window_x = x[start:row + 1]
+                sum_products = window_x.T @ window_x
+                sum_x = window_x.sum(axis=0)
+            else:
+                sum_products += np.outer(x[row], x[row])
+                sum_x += x[row]
+                if row - self.window >= 0:
+                    sum_products -= np.outer(x[row - self.window], x[row - self.window])
+                    sum_x -= x[row - self.window]
+
+            n_obs = row + 1 - start
+            window_valid = valid_count[row] - (valid_count[start - 1] if start > 0 else 0)
+            eligible = window_valid >= self.min_periods
+
+            covariance = sum_products - np.outer(sum_x, sum_x) / n_obs
+            std = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+            eligible &= std > 0
+            with np.errstate(invalid='ignore', divide='ignore'):
+                correlation = covariance / np.outer(std, std)
+            correlation[~eligible, :] = np.nan
+            correlation[:, ~eligible] = np.nan
+
+            n_eligible = eligible.sum()
+            if n_eligible > 1:
+                average_correlation[row - first_row, eligible] = (
+                    (np.nansum(correlation[eligible], axis=1) - 1.0) / (n_eligible - 1)
+                )
+            cluster[row - first_row] = self._connected_components(correlation >= self.cluster_threshold)
+        return average_correlation, cluster
+
+    @staticmethod
+    def _connected_components(linked: np.ndarray) -> np.ndarray:
+        """
+        Labels the connected components of a (tickers x tickers) adjacency matrix.
+
+        Every ticker starts with its own column index as label and repeatedly takes the
+        smallest label among its linked tickers until no label changes.
+
+        Parameters:
+        ----------
+        linked : np.ndarray
+            Boolean adjacency matrix.
+
+        Returns:
+        -------
+        labels : np.ndarray
+            The smallest column index in the component of each ticker.
+        """
+        n_tickers = len(linked)
+        labels = np.arange(n_tickers)
+        while True:
+            new_labels = np.minimum(labels, np.where(linked, labels[None, :], n_tickers).min(axis=1))
+            if np.array_equal(new_labels, labels):
+                return labels
+            labels = new_labels
+
+    def _sector_relative_return(self, returns: np.ndarray, tickers: pd.Index) -> np.ndarray:
+        """
+        private method to compute the return of every ticker minus the mean return of its sector.
+
+        Sector means are computed for all dates at once with a (tickers x sectors) membership matrix.
+
+        Parameters:
+        ----------
+        returns : np.ndarray
+            (dates x tickers) returns, NaN where a ticker has no return.
+        tickers : pd.Index
+            Ticker symbols of the columns of returns.
+
+        Returns:
+        -------
+        sector_relative_return : np.ndarray
+            (dates x tickers) sector relative returns, NaN for tickers without a known sector.
+        """
+        sectors = pd.Series([self.sectors.get(ticker) for ticker in tickers], dtype=object)
+        membership = pd.get_dummies(sectors).to_numpy(dtype='float64')
+        if membership.shape[1] == 0:
+            return np.full(returns.shape, np.nan)
+
+        valid = ~np.isnan(returns)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sector_mean = (np.where(valid, returns, 0.0) @ membership) / (valid @ membership)
+        sector_relative_return = returns - sector_mean @ membership.T
+        sector_relative_return[:, sectors.isna().to_numpy()] = np.nan
+        return sector_relative_return
+
+
+class CrossSectionalFeatureStorer:
+    """
+    A class to read the universe returns from 'processed_data' and store cross-sectional features
+    in the 'cross_sectional_features' table of the PostgreSQL database.
+
+    Methods:
+    --------
+    get_last_date_from_db() -> date:
+        Retrieves the last date that cross-sectional features were stored for.
+
+    get_last_complete_date(ticker_symbols, start_date) -> date:
+        Retrieves the last date on which every one of the ticker symbols is stored.
+
+    load_returns(ticker_symbols, end_date, lookback) -> pd.DataFrame:
+        Loads the aligned dates x tickers return matrix of the ticker symbols for all dates after end_date plus a lookback.
+
+    store(features):
+        Stores the features in a single bulk upsert.
+    """
+
+    def get_last_date_from_db(self):
+        """
+        Retrieves the last date that cross-sectional features were stored for.
+
+        Returns:
+            date: The last stored date, or None if no features exist.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT MAX(date) FROM cross_sectional_features")
+                result = cur.fetchone()
+            return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Error fetching last cross-sectional date from DB: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def get_last_complete_date(self, ticker_symbols: list, start_date=None):
+        """
+        Retrieves the last date on which every one of the ticker symbols has a row in 'processed_data'.
+
+        The tickers are stored one after another, so dates after this one may still be missing
+        tickers that have not been stored yet.
+
+        Args:
+            ticker_symbols (list): The ticker symbols of the universe, including the benchmark.
+            start_date (date): Only dates after this one are considered, or None for all dates.
+
+        Returns:
+            date: The last complete date, or None if there is none after start_date.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT MAX(date) FROM (
+                        SELECT date FROM processed_data
+                        WHERE ticker_symbol = ANY(%s) AND date > COALESCE(%s, '-infinity'::date)
+                        GROUP BY date
+                        HAVING COUNT(DISTINCT ticker_symbol) = %s
+                    ) AS complete_dates
+                """, (list(ticker_symbols), start_date, len(set(ticker_symbols))))
+                result = cur.fetchone()
+            return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Error fetching last complete date from DB: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def load_returns(self, ticker_symbols: list, end_date=None, lookback: int = 0) -> pd.DataFrame:
+        """
+        Loads daily returns of the ticker symbols from 'processed_data' as a dates x tickers matrix.
+
+        Other tickers stored in 'processed_data' are not part of the universe and are not loaded.
+
+        Args:
+            ticker_symbols (list): The ticker symbols of the universe, including the benchmark.
+            end_date (date): Last date that already has features. Rows after it are loaded together
+                with the `lookback` dates up to and including it. None loads the full history.
+            lookback (int): Number of stored dates to load before the new ones.
+
+        Returns:
+            pd.DataFrame: Daily returns indexed by date with one column per ticker symbol.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                ticker_symbols = list(dict.fromkeys(ticker_symbols))
+                if end_date is None:
+                    cur.execute("""
+                        SELECT date, ticker_symbol, daily_returns FROM processed_data
+                        WHERE ticker_symbol = ANY(%s)
+                    """, (ticker_symbols,))
+                else:
+                    cur.execute("""
+                        SELECT date, ticker_symbol, daily_returns FROM processed_data
+                        WHERE ticker_symbol = ANY(%s) AND date >= COALESCE((
+                            SELECT MIN(date) FROM (
+                                SELECT DISTINCT date FROM processed_data
+                                WHERE ticker_symbol = ANY(%s) AND date <= %s
+                                ORDER BY date DESC LIMIT %s
+                            ) AS lookback_dates
+                        ), %s)
+                    """, (ticker_symbols, ticker_symbols, end_date, lookback, end_date))
+                rows = cur.fetchall()
+        except Exception as e:
+            logger.error(f"Error loading returns from DB: {e}")
+            raise
+        finally:
+            conn.close()
+
+        returns = pd.DataFrame(rows, columns=['date', 'ticker_symbol', 'daily_returns'])
+        returns['date'] = pd.to_datetime(returns['date'])
+        return returns.pivot(index='date', columns='ticker_symbol', values='daily_returns').astype('float64')
+
+    def store(self, features: pd.DataFrame):
+        """
+        Stores cross-sectional features in the 'cross_sectional_features' table.
+
+        Parameters:
+        -----------
+        features : DataFrame
+            Output of CrossSectionalFeatureEngineer.engineer, indexed by (Date, ticker_symbol).
+
+        Raises:
+        -------
+        Exception
+            If any error occurs during the insert, the transaction is rolled back, and an error is logged.
+        """
+        if features.empty:
+            return
+
+        dates = features.index.get_level_values('Date').strftime('%Y-%m-%d')
+        values = features.astype(object).where(features.notna(), None)
+        rows = list(zip(dates, features.index.get_level_values('ticker_symbol'), *(values[c] for c in CROSS_SECTIONAL_FEATURES)))
+
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO cross_sectional_features (date, ticker_symbol, beta, average_correlation, correlation_cluster, relative_return, sector_relative_return, return_rank)
+                    VALUES %s
+                    ON CONFLICT (date, ticker_symbol) DO UPDATE SET
+                        beta = EXCLUDED.beta,
+                        average_correlation = EXCLUDED.average_correlation,
+                        correlation_cluster = EXCLUDED.correlation_cluster,
+                        relative_return = EXCLUDED.relative_return,
+                        sector_relative_return = EXCLUDED.sector_relative_return,
+                        return_rank = EXCLUDED.return_rank
+                """, rows)
+                conn.commit()
+            logger.info(f"Stored {len(rows)} cross-sectional feature rows in the database.")
+        except Exception as e:
+            logger.error(f"Error storing cross-sectional features: {e}")
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    storer = CrossSectionalFeatureStorer()
+    engineer = CrossSectionalFeatureEngineer()
+
+    # Only compute the dates after the last stored one, with enough history for the rolling window
+    universe = [*TICKER_SYMBOLS, BENCHMARK_TICKER_SYMBOL]
+    last_date = storer.get_last_date_from_db()
+    returns = storer.load_returns(universe, last_date, lookback=engineer.window)
+    start_date = last_date + pd.Timedelta(days=1) if last_date else None
+    end_date = storer.get_last_complete_date(universe, last_date)
+    if end_date is not None:
+        features = engineer.engineer(returns, start_date=start_date, end_date=end_date)
+        print(features.tail())
@@ -11,27 +11,41 @@ from src.handle_missing_value import MissingValueHandler
 Here I am using template design pattern for Feature Engineering
 """
 
+# Bump this whenever the features produced by FeatureEngineer change. It is part of the
+# cache key of the feature engineering step, see the README for what a bump recomputes.
+FEATURE_CONFIG_VERSION = "1"
+
 class FeatureEngineer:
     """
     A class for feature engineering of stock data.
 
+    Attributes
+    ----------
+    lookback : int
+        number of rows before the first new row that every feature depends on
+
     Methods
     -------
-    engineer(stock_data : pd.DataFrame) -> pd.DataFrame
+    engineer(stock_data : pd.DataFrame, history : pd.DataFrame = None) -> pd.DataFrame
         public method for stock data feature engineering
 
-    _create_features(stock_data : pd.DataFrame) -> pd.DataFrame
+    _create_features(stock_data : pd.DataFrame, history : pd.DataFrame = None) -> pd.DataFrame
         private method for stock data feature engineering. It will add 3 columns
         i.e. Return, Volatility, Moving Average    
     """
 
-    def engineer(self, stock_data : pd.DataFrame) -> pd.DataFrame:
+    lookback = 5
+
+    def engineer(self, stock_data : pd.DataFrame, history : pd.DataFrame = None) -> pd.DataFrame:
         """
         Public method for stock data feature engineering.
 
         Parameters:
         ----------
         stock_data : pd.DataFrame
+        history : pd.DataFrame
+            stored rows right before stock_data (at least `lookback` of them), used so that the
+            first new rows get the same features as if the whole history was engineered at once.
 
         Returns:
         -------
@@ -39,9 +53,9 @@ class FeatureEngineer:
             stock data with 3 more features added.
         """
         logger.info("Feature Engineering started")
-        return self._create_features(stock_data)
+        return self._create_features(stock_data, history)
 
-    def _create_features(self, stock_data : pd.DataFrame) -> pd.DataFrame:
+    def _create_features(self, stock_data : pd.DataFrame, history : pd.DataFrame = None) -> pd.DataFrame:
         """
         private method to create new features for stock data
 
@@ -53,15 +67,30 @@ class FeatureEngineer:
         Parameters:
         ----------
         stock_data : pd.DataFrame
+        history : pd.DataFrame
+            stored rows right before stock_data, only their 'Close' column is used.
 
         Returns:
         -------
         stock_data : pd.DataFrame
             A stock data with 3 columns added i.e. Return, Volatility, Moving Average
         """
-        stock_data['Return'] = stock_data['Close'].pct_change()
-        stock_data['Volatility'] = stock_data['Return'].rolling(window=5).std()
-        stock_data['Moving Average'] = stock_data['Close'].rolling(window=5).mean()
+        close = stock_data['Close']
+        if isinstance(close, pd.DataFrame):
+            # yfinance returns (Price, Ticker) column pairs, keep the first ticker
+            close = close.iloc[:, 0]
+        if history is not None:
+            close = pd.concat([history['Close'], close])
+
+        returns = close.pct_change()
+        volatility = returns.rolling(window=5).std()
+        moving_average = close.rolling(window=5).mean()
+
+        # Only the new rows are returned, the history just seeds the windows
+        n_history = len(close) - len(stock_data)
+        stock_data['Return'] = returns.to_numpy()[n_history:]
+        stock_data['Volatility'] = volatility.to_numpy()[n_history:]
+        stock_data['Moving Average'] = moving_average.to_numpy()[n_history:]
         logger.info("Feature Engineering completed successfully")
         return stock_data
     
@@ -8,15 +8,28 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from abc import ABC, abstractmethod
 import yfinance as yf
+from yfinance.exceptions import YFPricesMissingError
 import psycopg2
 from utils.config import DB_PARAMS
-from datetime import timedelta
+import hashlib
+from datetime import time, timedelta
 from utils.logger import logger
 
 """
 Here we are using Strategy Design Pattern for Fetching Stock Data.
 """
 
+# The daily bar of a session is only complete once the exchange has closed
+MARKET_TIMEZONE = 'America/New_York'
+MARKET_CLOSE = time(16, 0)
+
+# Raise failed requests instead of logging them and returning an empty frame, so rate limits
+# (YFRateLimitError) and other errors reach the FetchExecutor instead of looking like no new data
+yf.config.debug.hide_exceptions = False
+
+# Columns of the daily bars returned by the fetching strategies
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
 #Defining an abstract class for fetching data
 class DataFetchingStrategy:
     """
@@ -26,6 +39,9 @@ class DataFetchingStrategy:
     ----------
     fetch(ticker_symbol: str) -> pd.DataFrame:
         Fetches stock data for the given ticker symbol.
+
+    _fetch_history(ticker_symbol: str, allow_empty: bool, **kwargs) -> pd.DataFrame:
+        Fetches the adjusted daily bars of the ticker symbol, failed requests raise.
     """
     @abstractmethod
     def fetch(self, ticker_symbol : str) -> 'pd.DataFrame':
@@ -40,6 +56,41 @@ class DataFetchingStrategy:
         """
         raise NotImplementedError("This method should be overridden by subclasses.")
 
+    def _fetch_history(self, ticker_symbol : str, allow_empty : bool = False, **kwargs) -> 'pd.DataFrame':
+        """
+        Fetches the adjusted daily bars of a ticker symbol with yf.Ticker.history.
+
+        Errors of the request propagate, e.g. YFRateLimitError when the provider rate limits it,
+        so that the FetchExecutor can back off and retry.
+
+        Args:
+            ticker_symbol (str): The stock ticker symbol to fetch data for.
+            allow_empty (bool): Whether a result without any bar is valid.
+            **kwargs: The period or start date, passed to yf.Ticker.history.
+
+        Returns:
+            pd.DataFrame: The PRICE_COLUMNS indexed by the timezone naive session date.
+
+        Raises:
+            YFRateLimitError: If the provider rate limited the request.
+            ValueError: If the result has no bar and allow_empty is False.
+        """
+        try:
+            stock_data = yf.Ticker(ticker_symbol).history(actions=False, **kwargs)
+        except YFPricesMissingError as e:
+            if not allow_empty:
+                raise ValueError(f"Download of {ticker_symbol} returned no data: {e}") from e
+            stock_data = pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype='float64')
+        if stock_data.empty and not allow_empty:
+            raise ValueError(f"Download of {ticker_symbol} returned no data")
+        if stock_data.empty:
+            logger.warning(f"Download of {ticker_symbol} returned no data, e.g. because of a market holiday")
+            return stock_data
+
+        stock_data = stock_data[PRICE_COLUMNS]
+        stock_data.index = pd.DatetimeIndex(stock_data.index).tz_localize(None)
+        return stock_data
+
 class MaxPeriodFetchingStrategy(DataFetchingStrategy):
     """
     Concrete strategy for fetching the maximum period of stock data.
@@ -59,10 +110,12 @@ class MaxPeriodFetchingStrategy(DataFetchingStrategy):
 
         Returns:
             pd.DataFrame: The stock data for the maximum available period.
-        """
 
-        stock_data = yf.download(ticker_symbol, period='max')
-        return stock_data
+        Raises:
+            YFRateLimitError: If the provider rate limited the request.
+            ValueError: If the request returned no data.
+        """
+        return self._fetch_history(ticker_symbol, period='max')
 
 class HistoricalFetchingStrategy(DataFetchingStrategy):
     """
@@ -83,10 +136,13 @@ class HistoricalFetchingStrategy(DataFetchingStrategy):
             start_date (str): The start date to fetch data from.
 
         Returns:
-            pd.DataFrame: The stock data starting from the given date.
+            pd.DataFrame: The stock data starting from the given date. It is empty if no
+            session after start_date has a bar yet, e.g. on market holidays.
+
+        Raises:
+            YFRateLimitError: If the provider rate limited the request.
         """
-        stock_data = yf.download(ticker_symbol, start=start_date)
-        return stock_data
+        return self._fetch_history(ticker_symbol, allow_empty=True, start=start_date)
 
 class StockDataFetcher:
     """
@@ -95,23 +151,36 @@ class StockDataFetcher:
     Attributes:
     -----------
     ticker_symbol (str): The stock ticker symbol to fetch data for.
+    executor (FetchExecutor): Optional executor the strategy calls are run through.
 
     Methods:
     --------
     get_last_date_from_db() -> str:
         Retrieves the last date of processed data for the ticker symbol from the database.
 
+    get_last_session_date(now: pd.Timestamp = None) -> pd.Timestamp:
+        Returns the date of the most recent trading session with a complete daily bar.
+
+    get_stored_history(end_date=None, limit: int = None, start_date=None) -> pd.DataFrame:
+        Reads the stored OHLCV rows of the ticker symbol in a date range from the database.
+
+    get_cache_key() -> str:
+        Builds a cache key from the ticker symbol, stored watermark and fetch range.
+
     fetch_data() -> pd.DataFrame:
         Fetches stock data based on the last date in the database or from the start.
     """
-    def __init__(self, ticker_symbol:str) -> None:
+    def __init__(self, ticker_symbol:str, executor=None) -> None:
         """
         Initializes the StockDataFetcher with the given ticker symbol.
 
         Args:
             ticker_symbol (str): The stock ticker symbol to fetch data for.
+            executor (FetchExecutor): Optional executor that rate limits, retries and times out
+                the strategy calls. Without one the strategy is called directly.
         """
         self.ticker_symbol = ticker_symbol
+        self.executor = executor
 
     def get_last_date_from_db(self) -> str:
         """
@@ -137,6 +206,92 @@ class StockDataFetcher:
         finally:
             conn.close()
 
+    def get_last_session_date(self, now: 'pd.Timestamp' = None) -> 'pd.Timestamp':
+        """
+        Returns the date of the most recent trading session with a complete daily bar.
+
+        Before the market closes today's bar is still forming, so the session date (and
+        with it the cache key) only moves to today once the close has passed.
+
+        Args:
+            now (pd.Timestamp): The current time, defaults to the time in MARKET_TIMEZONE.
+
+        Returns:
+            pd.Timestamp: The last business day whose close has passed, without time zone.
+        """
+        now = pd.Timestamp.now(tz=MARKET_TIMEZONE) if now is None else now
+        if now.tzinfo is not None:
+            now = now.tz_convert(MARKET_TIMEZONE).tz_localize(None)
+        session_date = now.normalize()
+        if now.time() < MARKET_CLOSE:
+            session_date -= timedelta(days=1)
+        return pd.offsets.BDay().rollback(session_date)
+
+    def get_stored_history(self, end_date=None, limit: int = None, start_date=None) -> 'pd.DataFrame':
+        """
+        Reads the stored OHLCV rows of the ticker symbol in a date range from the database.
+
+        Args:
+            end_date: Only rows strictly before this date are read, or None for no upper bound.
+            limit (int): Number of most recent rows to read, or None for all of them.
+            start_date: Only rows on or after this date are read, or None for no lower bound.
+
+        Returns:
+            pd.DataFrame: Columns 'Open', 'High', 'Low', 'Close' and 'Volume' indexed by date in ascending order.
+
+        Raises:
+            Exception: If there is an error while fetching data from the database.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT date, open_price, high_price, low_price, close_price, volume FROM processed_data
+                    WHERE ticker_symbol = %s AND date < COALESCE(%s, 'infinity'::date)
+                        AND date >= COALESCE(%s, '-infinity'::date)
+                    ORDER BY date DESC
+                    LIMIT %s
+                """, (
+                    self.ticker_symbol,
+                    None if end_date is None else str(pd.Timestamp(end_date).date()),
+                    None if start_date is None else str(pd.Timestamp(start_date).date()),
+                    limit,
+                ))
+                rows = cur.fetchall()
+        except Exception as e:
+            logger.error(f"Error fetching stored history from DB: {e}")
+            raise
+        finally:
+            conn.close()
+
+        history = pd.DataFrame(rows[::-1], columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        history['Date'] = pd.to_datetime(history['Date'])
+        return history.set_index('Date').astype('float64')
+
+    def get_cache_key(self) -> str:
+        """
+        Builds a cache key that only changes when new data can exist for the ticker symbol.
+
+        The key combines the ticker symbol, the stored watermark (last processed date) and a
+        hash of the date range that would be fetched. The range ends at the last session with
+        a complete bar, so re-running before the next close produces the same key, and the
+        key changes as soon as a new bar can exist.
+
+        Returns:
+            str: The cache key, e.g. 'AAPL|2023-01-01|1f3a9c0b2d4e5f60'.
+        """
+        last_date = self.get_last_date_from_db()
+        start_date = pd.Timestamp(last_date) + timedelta(days=1) if last_date else None
+        end_date = self.get_last_session_date()
+        if start_date is not None and start_date > end_date:
+            # Nothing new to fetch, the range is empty
+            fetch_range = "empty"
+        else:
+            fetch_range = f"{start_date.date() if start_date is not None else 'max'}:{end_date.date()}"
+        range_hash = hashlib.sha256(fetch_range.encode()).hexdigest()[:16]
+        watermark = pd.Timestamp(last_date).date() if last_date else 'none'
+        return f"{self.ticker_symbol}|{watermark}|{range_hash}"
+
     def fetch_data(self) -> 'pd.DataFrame':
         """
         Fetches stock data based on the last date in the database or from the start if no data exists.
@@ -146,21 +301,42 @@ class StockDataFetcher:
 
         Notes:
             If there is a record of previous data in the database, it will fetch data starting from the day after the last processed date.
+            If that date is after the last trading session, an empty DataFrame is returned without downloading.
             Otherwise, it fetches the entire available stock data.
         """
 
         last_date = self.get_last_date_from_db()
         if last_date:
             start_date = last_date + timedelta(days=1)
-            strategy = HistoricalFetchingStrategy()
-            stock_data = strategy.fetch(self.ticker_symbol, start_date)
+            if pd.Timestamp(start_date) > self.get_last_session_date():
+                logger.info(f"No new data for {self.ticker_symbol} after {last_date}")
+                return pd.DataFrame(
+                    columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+                    index=pd.DatetimeIndex([], name='Date'),
+                    dtype='float64',
+                )
+            stock_data = self._run_strategy(HistoricalFetchingStrategy(), start_date)
         else:
-            strategy = MaxPeriodFetchingStrategy()
-            stock_data = strategy.fetch(self.ticker_symbol)
+            stock_data = self._run_strategy(MaxPeriodFetchingStrategy())
 
         logger.info(f"Fetched data for {self.ticker_symbol} from {start_date if last_date else 'beginning'}")
         return stock_data
 
+    def _run_strategy(self, strategy: DataFetchingStrategy, *args) -> 'pd.DataFrame':
+        """
+        Runs the strategy for the ticker symbol, through the executor if there is one.
+
+        Args:
+            strategy (DataFetchingStrategy): The strategy used to fetch the data.
+            *args: Further arguments of the strategy's fetch method, e.g. the start date.
+
+        Returns:
+            pd.DataFrame: The fetched stock data.
+        """
+        if self.executor is not None:
+            return self.executor.fetch(strategy, self.ticker_symbol, *args)
+        return strategy.fetch(self.ticker_symbol, *args)
+
 if __name__ == "__main__":
     # Example ticker symbol for testing
     ticker_symbol = "AAPL"
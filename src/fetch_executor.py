@@ -0,0 +1,304 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from yfinance.exceptions import YFRateLimitError
+from utils.logger import logger
+
+"""
+Here we are wrapping the data fetching strategies in an executor that runs them
+concurrently while respecting the limits of the data provider.
+"""
+
+
+class ThrottledError(Exception):
+    """
+    Raised by a data provider when it rejects a request because of rate limiting.
+    """
+
+
+class FetchError(Exception):
+    """
+    Raised when a fetch still fails after all retries.
+
+    Attributes:
+    -----------
+    ticker_symbol (str): The ticker symbol that could not be fetched.
+    """
+
+    def __init__(self, ticker_symbol: str, message: str) -> None:
+        super().__init__(message)
+        self.ticker_symbol = ticker_symbol
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by all worker threads.
+
+    Attributes:
+    -----------
+    rate (float): Tokens added per second, i.e. the sustained requests per second.
+    capacity (float): Maximum number of tokens, i.e. the largest burst of requests.
+
+    Methods:
+    --------
+    acquire() -> None:
+        Blocks until a token is available and takes it.
+    """
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        """
+        Initializes a full token bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of tokens, defaults to one second worth of tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available and takes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of requests in flight, halving the limit when the provider throttles
+    and growing it by one per limit's worth of successful requests (AIMD).
+
+    Attributes:
+    -----------
+    limit (float): The current concurrency limit.
+
+    Methods:
+    --------
+    acquire() -> None:
+        Blocks until fewer than `limit` requests are in flight.
+
+    release(throttled: bool) -> None:
+        Marks a request as finished and adapts the limit.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = None) -> None:
+        """
+        Initializes the limiter.
+
+        Args:
+            initial (int): Starting concurrency limit.
+            minimum (int): The limit is never reduced below this value.
+            maximum (int): The limit is never increased above this value, defaults to initial.
+        """
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum if maximum is not None else initial
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Blocks until fewer than `limit` requests are in flight.
+        """
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        """
+        Marks a request as finished and adapts the limit.
+
+        Args:
+            throttled (bool): Whether the provider throttled the request.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+                logger.warning(f"Provider throttled, reducing fetch concurrency to {int(self.limit)}")
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class FetchExecutor:
+    """
+    Runs data fetching strategies concurrently with rate limiting, adaptive concurrency,
+    retries with jittered exponential backoff, per-request timeouts and coalescing of
+    identical requests.
+
+    Attributes:
+    -----------
+    retries (int): Number of retries after the first attempt.
+    timeout (float): Seconds to wait for a single attempt.
+    backoff (float): Base delay in seconds between retries, doubled on every retry.
+    max_backoff (float): Upper bound of the delay between retries.
+    throttle_exceptions (tuple): Exceptions that mean the provider is throttling.
+
+    Methods:
+    --------
+    submit(strategy: DataFetchingStrategy, ticker_symbol: str, *args) -> Future:
+        Schedules a fetch, returning the pending future of an identical request if there is one.
+
+    fetch(strategy: DataFetchingStrategy, ticker_symbol: str, *args) -> pd.DataFrame:
+        Fetches stock data and waits for the result.
+
+    shutdown() -> None:
+        Waits for pending fetches and stops the worker threads.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: float = None, max_concurrency: int = 8, initial_concurrency: int = 4,
+                 retries: int = 3, timeout: float = 30.0, backoff: float = 1.0, max_backoff: float = 30.0,
+                 throttle_exceptions: tuple = (ThrottledError, YFRateLimitError)) -> None:
+        """
+        Initializes the FetchExecutor.
+
+        Args:
+            rate (float): Sustained requests per second sent to the provider.
+            burst (float): Largest burst of requests, defaults to one second worth of requests.
+            max_concurrency (int): Maximum number of requests in flight.
+            initial_concurrency (int): Number of requests in flight allowed at the start.
+            retries (int): Number of retries after the first attempt.
+            timeout (float): Seconds to wait for a single attempt.
+            backoff (float): Base delay in seconds between retries.
+            max_backoff (float): Upper bound of the delay between retries.
+            throttle_exceptions (tuple): Exceptions that mean the provider is throttling.
+        """
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.throttle_exceptions = throttle_exceptions
+        self.rate_limiter = TokenBucket(rate, burst)
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(min(initial_concurrency, max_concurrency), maximum=max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fetch")
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'FetchExecutor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def submit(self, strategy, ticker_symbol: str, *args) -> Future:
+        """
+        Schedules a fetch of stock data with the given strategy.
+
+        Args:
+            strategy (DataFetchingStrategy): The strategy used to fetch the data.
+            ticker_symbol (str): The stock ticker symbol to fetch data for.
+            *args: Further arguments of the strategy's fetch method, e.g. the start date.
+
+        Returns:
+            Future: Resolves to the stock data, or raises FetchError if every attempt failed.
+        """
+        key = (type(strategy), ticker_symbol, args)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                logger.info(f"Coalescing duplicate fetch for {ticker_symbol}")
+                return future
+            future = self._pool.submit(self._fetch_with_retries, strategy, ticker_symbol, args)
+            self._pending[key] = future
+        # Registered outside the lock: a fetch that already finished runs the callback right
+        # here, and _forget takes the lock itself
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def fetch(self, strategy, ticker_symbol: str, *args) -> 'pd.DataFrame':
+        """
+        Fetches stock data with the given strategy and waits for the result.
+
+        Args:
+            strategy (DataFetchingStrategy): The strategy used to fetch the data.
+            ticker_symbol (str): The stock ticker symbol to fetch data for.
+            *args: Further arguments of the strategy's fetch method, e.g. the start date.
+
+        Returns:
+            pd.DataFrame: The stock data.
+
+        Raises:
+            FetchError: If every attempt failed.
+        """
+        return self.submit(strategy, ticker_symbol, *args).result()
+
+    def shutdown(self) -> None:
+        """
+        Waits for pending fetches and stops the worker threads.
+        """
+        self._pool.shutdown(wait=True)
+
+    def _forget(self, key: tuple) -> None:
+        """
+        Removes a finished request so that later identical requests fetch again.
+        """
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _fetch_with_retries(self, strategy, ticker_symbol: str, args: tuple) -> 'pd.DataFrame':
+        """
+        Runs the fetch, retrying failed attempts with full-jitter exponential backoff.
+
+        Raises:
+            FetchError: If every attempt failed.
+        """
+        last_error = None
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire()
+            self.concurrency_limiter.acquire()
+            call = self._start_call(strategy.fetch, ticker_symbol, *args)
+            # The slot is held until the call really finishes, also after a timeout, so
+            # abandoned requests still count against the provider's limit
+            call.add_done_callback(
+                lambda done: self.concurrency_limiter.release(isinstance(done.exception(), self.throttle_exceptions))
+            )
+            try:
+                return call.result(timeout=self.timeout)
+            except Exception as e:
+                last_error = e
+
+            logger.warning(f"Fetch attempt {attempt + 1} for {ticker_symbol} failed: {last_error!r}")
+            if attempt < self.retries:
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+        logger.error(f"Giving up fetching {ticker_symbol} after {self.retries + 1} attempts")
+        raise FetchError(ticker_symbol, f"Failed to fetch {ticker_symbol}: {last_error!r}") from last_error
+
+    def _start_call(self, function, *args) -> Future:
+        """
+        Calls the function in a separate thread, so that the caller can stop waiting for it.
+
+        A call that times out keeps running in the background, its result is discarded.
+
+        Returns:
+            Future: Resolves to the result of the call.
+        """
+        call = Future()
+
+        def run():
+            try:
+                call.set_result(function(*args))
+            except BaseException as e:
+                call.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return call
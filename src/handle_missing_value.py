@@ -42,6 +42,9 @@ class MissingValueHandler:
         Private method to handle missing values by forward filling and
         dropping remaining rows with NaNs.
 
+        Values are never backward filled, as that would copy later prices into
+        earlier rows. Only leading rows without any earlier value are dropped.
+
         Parameters
         ----------
         stock_data : DataFrame
@@ -56,11 +59,13 @@ class MissingValueHandler:
         
         # Check if any missing values are present in the DataFrame
         if stock_data.isnull().values.any():
-            # Forward fill then Backward fill
-            stock_data = stock_data.fillna(method='ffill').fillna(method='bfill')
+            # Forward fill only, each row may use past values but never future ones
+            stock_data = stock_data.ffill()
             
             # Drop rows where NaNs still exist after forward filling
+            rows_before = len(stock_data)
             stock_data = stock_data.dropna()
+            logger.info(f"Dropped {rows_before - len(stock_data)} rows without earlier values to forward fill")
         
         logger.info("Handling Missing Value Completed Successfully")
         return stock_data
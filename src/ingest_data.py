@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from src.fetch_data import StockDataFetcher
+from src.fetch_executor import FetchExecutor, FetchError
 import pandas as pd
 from utils.logger import logger
 
@@ -8,17 +10,18 @@ class DataIngestor:
     This class uses a StockDataFetcher to retrieve data for a specified stock ticker symbol.
     """
 
-    def create_fetcher(self, ticker_symbol: str) -> StockDataFetcher:
+    def create_fetcher(self, ticker_symbol: str, executor: FetchExecutor = None) -> StockDataFetcher:
         """
         Creates an instance of StockDataFetcher for the given ticker symbol.
 
         Args:
             ticker_symbol (str): The stock ticker symbol for which to fetch data.
+            executor (FetchExecutor): Optional executor the fetcher runs its strategy through.
         
         Returns:
             StockDataFetcher: An instance of StockDataFetcher initialized with the provided ticker symbol.
         """
-        return StockDataFetcher(ticker_symbol)
+        return StockDataFetcher(ticker_symbol, executor)
 
     def ingest_data(self, ticker_symbol: str) -> 'pd.DataFrame':
         """
@@ -44,6 +47,53 @@ class DataIngestor:
         logger.info("Data Ingestion Completed Successfully")
         return stock_data
 
+    def ingest_many(self, ticker_symbols: list, executor: FetchExecutor = None) -> dict:
+        """
+        Ingests stock data for several ticker symbols concurrently.
+
+        All downloads go through one FetchExecutor, so they share its rate limit and
+        concurrency limit. Duplicate ticker symbols are ingested once.
+
+        Args:
+            ticker_symbols (list): The stock ticker symbols for which to ingest data.
+            executor (FetchExecutor): The executor to use. If None, one with default limits is
+                created and shut down afterwards.
+
+        Returns:
+            dict: Ticker symbol -> DataFrame with the ingested stock data.
+
+        Raises:
+            FetchError: If any ticker symbol could not be fetched. It is raised once every ticker
+                symbol has been attempted and lists all that failed.
+        """
+        logger.info(f"Started Data Ingestion for {len(ticker_symbols)} tickers")
+        owns_executor = executor is None
+        executor = executor or FetchExecutor()
+        ticker_symbols = list(dict.fromkeys(ticker_symbols))
+        try:
+            # Worker threads only run the DB lookup and wait, the executor gates the downloads
+            with ThreadPoolExecutor(max_workers=executor.concurrency_limiter.maximum) as pool:
+                futures = {
+                    ticker_symbol: pool.submit(self.create_fetcher(ticker_symbol, executor).fetch_data)
+                    for ticker_symbol in ticker_symbols
+                }
+                stock_data, failed = {}, []
+                for ticker_symbol, future in futures.items():
+                    try:
+                        stock_data[ticker_symbol] = future.result()
+                    except FetchError:
+                        failed.append(ticker_symbol)
+        finally:
+            if owns_executor:
+                executor.shutdown()
+
+        if failed:
+            logger.error(f"Data Ingestion failed for {failed}")
+            raise FetchError(", ".join(failed), f"Failed to ingest {len(failed)} of {len(ticker_symbols)} tickers: {failed}")
+        logger.info("Data Ingestion Completed Successfully")
+        return stock_data
+
+
 if __name__ == "__main__":
     # Creating an instance of DataIngestor
     data_ingestor = DataIngestor()
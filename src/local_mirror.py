@@ -0,0 +1,260 @@
+import json
+import numpy as np
+import psycopg2
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config import DB_PARAMS, LOCAL_MIRROR_PATH
+from utils.logger import logger
+
+"""
+Here we are mirroring 'processed_data' into a local columnar store for research workloads.
+Every ticker has its own directory with one raw binary file per column and a date index.
+New rows are appended and rows overwritten in the database are rewritten from their date on.
+A small metadata file records how many rows are complete and the last database write that
+was mirrored, so readers can memory-map the files and get views without copying.
+"""
+
+# Column name in processed_data -> dtype of the mirrored file
+MIRROR_COLUMNS = {
+    'open_price': np.float64,
+    'high_price': np.float64,
+    'low_price': np.float64,
+    'close_price': np.float64,
+    'volume': np.float64,
+    'moving_average': np.float64,
+    'volatility': np.float64,
+    'daily_returns': np.float64,
+}
+
+DATE_COLUMN = 'date'
+DATE_DTYPE = np.dtype('datetime64[D]')
+# Column of processed_data with the time a row was last written
+UPDATED_AT_COLUMN = 'updated_at'
+META_FILENAME = 'meta.json'
+
+
+class LocalMirror:
+    """
+    A class to sync 'processed_data' into per-ticker memory-mapped column files and read them back.
+
+    Attributes:
+    -----------
+    root (str): Directory holding one subdirectory per ticker symbol.
+
+    Methods:
+    --------
+    sync(ticker_symbols: list = None) -> dict:
+        Writes the rows stored or overwritten since each ticker's last sync.
+
+    load(ticker_symbol: str, start_date=None, end_date=None) -> dict:
+        Returns zero-copy views of the columns for a ticker and date range.
+
+    get_watermark(ticker_symbol: str) -> np.datetime64:
+        Returns the last mirrored date of a ticker.
+    """
+
+    def __init__(self, root: str = LOCAL_MIRROR_PATH) -> None:
+        """
+        Initializes the LocalMirror.
+
+        Args:
+            root (str): Directory of the mirror, created on the first sync.
+        """
+        self.root = root
+
+    def sync(self, ticker_symbols: list = None) -> dict:
+        """
+        Writes the rows stored in 'processed_data' since each ticker's last sync.
+
+        Rows after the local watermark are new. Rows written after the last mirrored write,
+        e.g. features restated after a FEATURE_CONFIG_VERSION change, are overwritten rows,
+        so the mirror is rewritten from the first such date on.
+
+        Args:
+            ticker_symbols (list): Ticker symbols to sync, or None for every ticker in 'processed_data'.
+
+        Returns:
+            dict: Ticker symbol -> number of rows written.
+
+        Raises:
+            Exception: If there is an error while reading from the database.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                if ticker_symbols is None:
+                    cur.execute("SELECT DISTINCT ticker_symbol FROM processed_data")
+                    ticker_symbols = [row[0] for row in cur.fetchall()]
+
+                written = {}
+                for ticker_symbol in ticker_symbols:
+                    watermark = self.get_watermark(ticker_symbol)
+                    cur.execute(f"""
+                        SELECT {DATE_COLUMN}, {', '.join(MIRROR_COLUMNS)}, {UPDATED_AT_COLUMN} FROM processed_data
+                        WHERE ticker_symbol = %s AND {DATE_COLUMN} >= (
+                            SELECT MIN({DATE_COLUMN}) FROM processed_data
+                            WHERE ticker_symbol = %s AND (
+                                {DATE_COLUMN} > COALESCE(%s, '-infinity'::date)
+                                OR {UPDATED_AT_COLUMN} > COALESCE(%s::timestamptz, '-infinity'::timestamptz)
+                            )
+                        )
+                        ORDER BY {DATE_COLUMN}
+                    """, (
+                        ticker_symbol,
+                        ticker_symbol,
+                        None if watermark is None else str(watermark),
+                        self._read_meta(ticker_symbol)['updated_at'],
+                    ))
+                    written[ticker_symbol] = self._write_tail(ticker_symbol, cur.fetchall())
+        except Exception as e:
+            logger.error(f"Error syncing local mirror: {e}")
+            raise
+        finally:
+            conn.close()
+
+        logger.info(f"Synced local mirror: {sum(written.values())} rows for {len(written)} tickers")
+        return written
+
+    def load(self, ticker_symbol: str, start_date=None, end_date=None) -> dict:
+        """
+        Returns the mirrored columns of a ticker symbol for a date range.
+
+        The arrays are slices of read-only memory maps, so no data is read until it is used.
+
+        Args:
+            ticker_symbol (str): The stock ticker symbol to read.
+            start_date: First date to include (anything np.datetime64 accepts), or None.
+            end_date: Last date to include, or None.
+
+        Returns:
+            dict: 'date' and every column in MIRROR_COLUMNS -> np.ndarray view.
+        """
+        n_rows = self._read_row_count(ticker_symbol)
+        columns = {DATE_COLUMN: self._map(ticker_symbol, DATE_COLUMN, DATE_DTYPE, n_rows)}
+        for name, dtype in MIRROR_COLUMNS.items():
+            columns[name] = self._map(ticker_symbol, name, dtype, n_rows)
+
+        dates = columns[DATE_COLUMN]
+        start = 0 if start_date is None else np.searchsorted(dates, np.datetime64(start_date, 'D'), side='left')
+        end = n_rows if end_date is None else np.searchsorted(dates, np.datetime64(end_date, 'D'), side='right')
+        return {name: values[start:end] for name, values in columns.items()}
+
+    def get_watermark(self, ticker_symbol: str):
+        """
+        Returns the last mirrored date of a ticker symbol.
+
+        Args:
+            ticker_symbol (str): The stock ticker symbol.
+
+        Returns:
+            np.datetime64: The last mirrored date, or None if nothing is mirrored yet.
+        """
+        n_rows = self._read_row_count(ticker_symbol)
+        if n_rows == 0:
+            return None
+        return self._map(ticker_symbol, DATE_COLUMN, DATE_DTYPE, n_rows)[-1]
+
+    def _write_tail(self, ticker_symbol: str, rows: list) -> int:
+        """
+        Writes database rows to the column files of a ticker symbol from the date of the first row on.
+
+        Mirrored rows from that date on are overwritten, bytes left behind beyond the new
+        row count are truncated. The row count is first lowered to the rows before that date
+        and only raised again once every column is written, so an interrupted write leaves
+        a consistent mirror that the next sync continues from.
+
+        Args:
+            ticker_symbol (str): The stock ticker symbol.
+            rows (list): Rows of (date, *MIRROR_COLUMNS, updated_at) sorted by date.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if not rows:
+            return 0
+
+        directory = os.path.join(self.root, ticker_symbol)
+        os.makedirs(directory, exist_ok=True)
+        meta = self._read_meta(ticker_symbol)
+
+        values = list(zip(*rows))
+        arrays = {DATE_COLUMN: np.array(values[0], dtype=DATE_DTYPE)}
+        for i, (name, dtype) in enumerate(MIRROR_COLUMNS.items(), start=1):
+            arrays[name] = np.array([np.nan if v is None else v for v in values[i]], dtype=dtype)
+        updated_at = max((v for v in values[-1] if v is not None), default=None)
+
+        # Rows before the first written date are kept
+        dates = self._map(ticker_symbol, DATE_COLUMN, DATE_DTYPE, meta['rows'])
+        n_rows = int(np.searchsorted(dates, arrays[DATE_COLUMN][0], side='left'))
+        del dates
+        if n_rows < meta['rows']:
+            self._write_meta(ticker_symbol, n_rows, meta['updated_at'])
+
+        for name, array in arrays.items():
+            path = self._column_path(ticker_symbol, name)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(n_rows * array.itemsize)
+                f.write(array.tobytes())
+                f.truncate()
+
+        self._write_meta(
+            ticker_symbol,
+            n_rows + len(rows),
+            meta['updated_at'] if updated_at is None else updated_at.isoformat(),
+        )
+        return len(rows)
+
+    def _map(self, ticker_symbol: str, name: str, dtype, n_rows: int) -> np.ndarray:
+        """
+        Memory-maps the first n_rows values of a column file read-only.
+        """
+        if n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(ticker_symbol, name), dtype=dtype, mode='r', shape=(n_rows,))
+
+    def _column_path(self, ticker_symbol: str, name: str) -> str:
+        """
+        Returns the path of a column file of a ticker symbol.
+        """
+        return os.path.join(self.root, ticker_symbol, f"{name}.bin")
+
+    def _read_row_count(self, ticker_symbol: str) -> int:
+        """
+        Returns the number of complete rows mirrored for a ticker symbol.
+        """
+        return self._read_meta(ticker_symbol)['rows']
+
+    def _read_meta(self, ticker_symbol: str) -> dict:
+        """
+        Returns the metadata of a ticker symbol: the number of complete rows and the
+        ISO formatted time of the last mirrored database write, or None.
+        """
+        path = os.path.join(self.root, ticker_symbol, META_FILENAME)
+        if not os.path.exists(path):
+            return {'rows': 0, 'updated_at': None}
+        with open(path) as f:
+            meta = json.load(f)
+        return {'rows': meta['rows'], 'updated_at': meta.get('updated_at')}
+
+    def _write_meta(self, ticker_symbol: str, n_rows: int, updated_at: str) -> None:
+        """
+        Records the number of complete rows and the last mirrored write, replacing the
+        file atomically so that readers never see a partly written count.
+        """
+        path = os.path.join(self.root, ticker_symbol, META_FILENAME)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'rows': n_rows, 'updated_at': updated_at}, f)
+        os.replace(path + '.tmp', path)
+
+
+if __name__ == "__main__":
+    # Bring the local mirror up to date with the database
+    mirror = LocalMirror()
+    mirror.sync()
+
+    # Example ticker symbol for testing
+    ticker_symbol = "AAPL"
+    columns = mirror.load(ticker_symbol, start_date='2020-01-01')
+    print(columns['date'][-5:], columns['close_price'][-5:])
@@ -0,0 +1,251 @@
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config import DB_PARAMS
+from utils.logger import logger
+
+"""
+Here I am using template design pattern for rolling up processed stock data to coarser
+resolutions. Only the newly stored rows are aggregated, and each aggregate is merged into
+the stored row of its period, so only the periods touched by the new rows are written.
+"""
+
+# Resolution name -> pandas period frequency
+ROLLUP_RESOLUTIONS = {
+    'weekly': 'W',
+    'monthly': 'M',
+}
+
+ROLLUP_COLUMNS = [
+    'first_date', 'last_date', 'open_price', 'high_price', 'low_price', 'close_price', 'prev_close',
+    'volume', 'bar_count', 'period_return', 'volatility_sum', 'volatility_count', 'moving_average',
+]
+
+
+class DataRollup:
+    """
+    A class to aggregate processed stock data to weekly and monthly bars.
+
+    Methods
+    -------
+    rollup(stock_data : pd.DataFrame, previous_close : float = None) -> dict
+        public method that aggregates the stock data to every resolution in ROLLUP_RESOLUTIONS
+
+    _aggregate(stock_data : pd.DataFrame, frequency : str, previous_close : float = None) -> pd.DataFrame
+        private method that aggregates the stock data to one resolution
+    """
+
+    def rollup(self, stock_data: pd.DataFrame, previous_close: float = None) -> dict:
+        """
+        Public method to aggregate processed stock data to coarser resolutions.
+
+        Parameters:
+        ----------
+        stock_data : pd.DataFrame
+            Output of the FeatureEngineer, indexed by date.
+        previous_close : float, optional
+            Stored close of the bar right before stock_data, the base of the first period's return.
+
+        Returns:
+        -------
+        rollups : dict
+            Resolution name -> DataFrame indexed by period start with the columns in ROLLUP_COLUMNS.
+        """
+        logger.info("Rollup started")
+        rollups = {
+            resolution: self._aggregate(stock_data, frequency, previous_close)
+            for resolution, frequency in ROLLUP_RESOLUTIONS.items()
+        }
+        logger.info("Rollup completed successfully")
+        return rollups
+
+    def _aggregate(self, stock_data: pd.DataFrame, frequency: str, previous_close: float = None) -> pd.DataFrame:
+        """
+        private method to aggregate the stock data to one resolution.
+
+        OHLCV columns are aggregated as first open, max high, min low, last close and summed
+        volume. The close before the period is kept as prev_close and the period return is
+        computed from the two closes, volatility is kept as a sum and count so that partial
+        periods can be merged, and the last moving average is kept.
+
+        Parameters:
+        ----------
+        stock_data : pd.DataFrame
+        frequency : str
+            pandas period frequency, e.g. 'W' or 'M'.
+        previous_close : float, optional
+            Close before the first row, NaN prev_close and period return if not given.
+
+        Returns:
+        -------
+        aggregated : pd.DataFrame
+            One row per period, indexed by the period start date.
+        """
+        def column(name):
+            # yfinance returns (Price, Ticker) column pairs, keep the first ticker. Indexing
+            # instead of reshaping also works for an empty frame.
+            values = np.asarray(stock_data[name], dtype='float64')
+            return values[:, 0] if values.ndim > 1 else values
+
+        dates = pd.DatetimeIndex(stock_data.index)
+        flat = pd.DataFrame({
+            'first_date': dates,
+            'last_date': dates,
+            'open_price': column('Open'),
+            'high_price': column('High'),
+            'low_price': column('Low'),
+            'close_price': column('Close'),
+            'volume': column('Volume'),
+            'bar_count': 1,
+            'volatility_sum': column('Volatility'),
+            'volatility_count': ~np.isnan(column('Volatility')),
+            'moving_average': column('Moving Average'),
+        }, index=dates.to_period(frequency).start_time)
+
+        aggregated = flat.groupby(level=0, sort=True).agg({
+            'first_date': 'min',
+            'last_date': 'max',
+            'open_price': 'first',
+            'high_price': 'max',
+            'low_price': 'min',
+            'close_price': 'last',
+            'volume': 'sum',
+            'bar_count': 'sum',
+            'volatility_sum': 'sum',
+            'volatility_count': 'sum',
+            'moving_average': 'last',
+        })
+        # The close before a period is the last close of the period before it
+        prev_close = aggregated['close_price'].shift(1)
+        prev_close.iloc[:1] = np.nan if previous_close is None else previous_close
+        aggregated['prev_close'] = prev_close
+        aggregated['period_return'] = aggregated['close_price'] / aggregated['prev_close'] - 1
+        aggregated.index.name = 'period_start'
+        return aggregated[ROLLUP_COLUMNS]
+
+
+class RollupStorer:
+    """
+    A class to maintain rollups in the 'processed_data_rollups' table of the PostgreSQL database.
+
+    Methods:
+    --------
+    store(rollups, ticker_symbol):
+        Merges the aggregated periods into the stored rollups in a single bulk upsert.
+
+    load(ticker_symbol, resolution, start_date, end_date) -> pd.DataFrame:
+        Reads stored rollups for a ticker symbol and resolution by primary key range.
+    """
+
+    def store(self, rollups: dict, ticker_symbol: str):
+        """
+        Merges aggregated periods into the 'processed_data_rollups' table.
+
+        A period that already exists (the open week or month) is merged with the new
+        aggregate: high/low are extended, close and moving average replaced, volume,
+        bar count and volatility sums added, and the return recomputed from the new close
+        and the stored prev_close. Aggregates that start
+        on or before the stored last date of their period are ignored, so storing the
+        same rows twice does not count them twice.
+
+        Parameters:
+        -----------
+        rollups : dict
+            Output of DataRollup.rollup.
+        ticker_symbol : str
+            The stock ticker symbol associated with the data.
+
+        Raises:
+        -------
+        Exception
+            If any error occurs during the upsert, the transaction is rolled back, and an error is logged.
+        """
+        rows = []
+        for resolution, aggregated in rollups.items():
+            values = aggregated.astype(object).where(aggregated.notna(), None)
+            values['first_date'] = aggregated['first_date'].dt.strftime('%Y-%m-%d')
+            values['last_date'] = aggregated['last_date'].dt.strftime('%Y-%m-%d')
+            rows.extend(zip(
+                [resolution] * len(aggregated),
+                [ticker_symbol] * len(aggregated),
+                aggregated.index.strftime('%Y-%m-%d'),
+                *(values[c] for c in ROLLUP_COLUMNS),
+            ))
+        if not rows:
+            return
+
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO processed_data_rollups AS r (resolution, ticker_symbol, period_start, first_date, last_date, open_price, high_price, low_price, close_price, prev_close, volume, bar_count, period_return, volatility_sum, volatility_count, moving_average)
+                    VALUES %s
+                    ON CONFLICT (resolution, ticker_symbol, period_start) DO UPDATE SET
+                        last_date = EXCLUDED.last_date,
+                        high_price = GREATEST(r.high_price, EXCLUDED.high_price),
+                        low_price = LEAST(r.low_price, EXCLUDED.low_price),
+                        close_price = EXCLUDED.close_price,
+                        volume = r.volume + EXCLUDED.volume,
+                        bar_count = r.bar_count + EXCLUDED.bar_count,
+                        period_return = EXCLUDED.close_price / r.prev_close - 1,
+                        volatility_sum = r.volatility_sum + EXCLUDED.volatility_sum,
+                        volatility_count = r.volatility_count + EXCLUDED.volatility_count,
+                        moving_average = EXCLUDED.moving_average
+                    WHERE EXCLUDED.first_date > r.last_date
+                """, rows)
+                conn.commit()
+            logger.info(f"Stored {len(rows)} rollup periods for {ticker_symbol} in the database.")
+        except Exception as e:
+            logger.error(f"Error storing rollups for {ticker_symbol}: {e}")
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def load(self, ticker_symbol: str, resolution: str, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Reads stored rollups for a ticker symbol and resolution.
+
+        Args:
+            ticker_symbol (str): The stock ticker symbol to read.
+            resolution (str): One of the keys of ROLLUP_RESOLUTIONS, e.g. 'weekly'.
+            start_date (date): First period start to read, or None for the full history.
+            end_date (date): Last period start to read, or None for the full history.
+
+        Returns:
+            pd.DataFrame: The rollups indexed by period start, with the average volatility added.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT period_start, {', '.join(ROLLUP_COLUMNS)} FROM processed_data_rollups
+                    WHERE resolution = %s AND ticker_symbol = %s
+                        AND period_start >= COALESCE(%s, '-infinity'::date)
+                        AND period_start <= COALESCE(%s, 'infinity'::date)
+                    ORDER BY period_start
+                """, (resolution, ticker_symbol, start_date, end_date))
+                rows = cur.fetchall()
+        except Exception as e:
+            logger.error(f"Error loading {resolution} rollups for {ticker_symbol}: {e}")
+            raise
+        finally:
+            conn.close()
+
+        rollups = pd.DataFrame(rows, columns=['period_start'] + ROLLUP_COLUMNS).set_index('period_start')
+        rollups['avg_volatility'] = rollups['volatility_sum'] / rollups['volatility_count'].where(rollups['volatility_count'] > 0)
+        return rollups
+
+
+if __name__ == "__main__":
+    # Example ticker symbol for testing
+    ticker_symbol = "AAPL"
+
+    # Read the stored weekly bars
+    weekly = RollupStorer().load(ticker_symbol, 'weekly')
+    print(weekly.tail())
@@ -1,4 +1,6 @@
 import psycopg2
+from psycopg2.extras import execute_values
+import numpy as np
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -8,7 +10,8 @@ from utils.logger import logger
 
 from src.ingest_data import DataIngestor
 from src.handle_missing_value import MissingValueHandler
-from src.feature_engineering import FeatureEngineer
+from src.feature_engineering import FeatureEngineer, FEATURE_CONFIG_VERSION
+from src.fetch_data import StockDataFetcher
 
 
 class DataStorer:
@@ -17,15 +20,29 @@ class DataStorer:
 
     Methods:
     --------
-    store(stock_data, ticker_symbol):
+    store(stock_data, ticker_symbol, feature_config_version=FEATURE_CONFIG_VERSION):
         Stores stock data for a specified ticker symbol in the database.
-        Inserts data row-by-row, and handles conflicts by ignoring duplicates.
+        Inserts data row-by-row, and overwrites rows that are already stored.
+
+    get_first_stale_date(ticker_symbol, feature_config_version=FEATURE_CONFIG_VERSION):
+        Returns the first stored date whose features were computed with another configuration version.
+
+    restate_features(ticker_symbol, feature_config_version=FEATURE_CONFIG_VERSION):
+        Recomputes the features of the stale stored rows from their stored OHLCV values.
+
+    store_quarantine(quarantined_data, ticker_symbol):
+        Stores rows that failed validation in the 'quarantined_data' table in a single bulk insert.
     """
 
-    def store(self, stock_data, ticker_symbol):
+    def store(self, stock_data, ticker_symbol, feature_config_version=FEATURE_CONFIG_VERSION):
         """
         Stores processed stock data in the 'processed_data' table of the PostgreSQL database.
 
+        A row that already exists for the date and ticker symbol is overwritten, so features
+        recomputed with a new FEATURE_CONFIG_VERSION replace the stored ones. Every row records
+        the version its features were computed with and the time it was last written, which
+        LocalMirror.sync uses to find overwritten rows.
+
         Parameters:
         -----------
         stock_data : DataFrame
@@ -33,6 +50,8 @@ class DataStorer:
             'Moving Average', 'Volatility', and 'Return'.
         ticker_symbol : str
             The stock ticker symbol associated with the data.
+        feature_config_version : str
+            Version of the feature configuration the features were computed with.
 
         Raises:
         -------
@@ -58,10 +77,20 @@ class DataStorer:
 
                     # Execute the SQL insert statement
                     cur.execute("""
-                        INSERT INTO processed_data (date, ticker_symbol, open_price, high_price, low_price, close_price, volume, moving_average, volatility, daily_returns)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (date, ticker_symbol) DO NOTHING
-                    """, (date_str, ticker_symbol, open_price, high_price, low_price, close_price, volume, moving_average, volatility, daily_returns))
+                        INSERT INTO processed_data (date, ticker_symbol, open_price, high_price, low_price, close_price, volume, moving_average, volatility, daily_returns, feature_config_version, updated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, now())
+                        ON CONFLICT (date, ticker_symbol) DO UPDATE SET
+                            open_price = EXCLUDED.open_price,
+                            high_price = EXCLUDED.high_price,
+                            low_price = EXCLUDED.low_price,
+                            close_price = EXCLUDED.close_price,
+                            volume = EXCLUDED.volume,
+                            moving_average = EXCLUDED.moving_average,
+                            volatility = EXCLUDED.volatility,
+                            daily_returns = EXCLUDED.daily_returns,
+                            feature_config_version = EXCLUDED.feature_config_version,
+                            updated_at = EXCLUDED.updated_at
+                    """, (date_str, ticker_symbol, open_price, high_price, low_price, close_price, volume, moving_average, volatility, daily_returns, feature_config_version))
                 
                 conn.commit()
             logger.info(f"Stored data for {ticker_symbol} in the database.")
@@ -72,6 +101,113 @@ class DataStorer:
         finally:
             conn.close()
 
+    def get_first_stale_date(self, ticker_symbol, feature_config_version=FEATURE_CONFIG_VERSION):
+        """
+        Returns the first stored date of a ticker symbol whose features were computed with another
+        FEATURE_CONFIG_VERSION, or None if every stored row is current.
+
+        Parameters:
+        -----------
+        ticker_symbol : str
+            The stock ticker symbol to check.
+        feature_config_version : str
+            The current version of the feature configuration.
+        """
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT MIN(date) FROM processed_data
+                    WHERE ticker_symbol = %s AND feature_config_version IS DISTINCT FROM %s
+                """, (ticker_symbol, feature_config_version))
+                return cur.fetchone()[0]
+        finally:
+            conn.close()
+
+    def restate_features(self, ticker_symbol, feature_config_version=FEATURE_CONFIG_VERSION):
+        """
+        Recomputes the features of the stored rows of a ticker symbol after a FEATURE_CONFIG_VERSION change.
+
+        The stored OHLCV values from the first stale date on are engineered again, seeded with the
+        rows stored right before it, and overwrite the stored rows, so nothing has to be fetched again.
+        Rollups are not rebuilt.
+
+        Parameters:
+        -----------
+        ticker_symbol : str
+            The stock ticker symbol whose rows are restated.
+        feature_config_version : str
+            The current version of the feature configuration.
+
+        Returns:
+        --------
+        int
+            Number of restated rows.
+        """
+        stale_date = self.get_first_stale_date(ticker_symbol, feature_config_version)
+        if stale_date is None:
+            return 0
+
+        engineer = FeatureEngineer()
+        fetcher = StockDataFetcher(ticker_symbol)
+        history = fetcher.get_stored_history(stale_date, limit=engineer.lookback)
+        stock_data = engineer.engineer(fetcher.get_stored_history(start_date=stale_date), history)
+        self.store(stock_data, ticker_symbol, feature_config_version)
+        logger.info(f"Restated {len(stock_data)} rows for {ticker_symbol} with feature config version {feature_config_version}.")
+        return len(stock_data)
+
+    def store_quarantine(self, quarantined_data, ticker_symbol):
+        """
+        Stores rows rejected by the DataValidator in the 'quarantined_data' table of the PostgreSQL database.
+
+        All rows are sent in one bulk insert. The table is expected to have the columns
+        (date, ticker_symbol, open_price, high_price, low_price, close_price, volume, failed_rules)
+        and a unique constraint on (date, ticker_symbol, failed_rules). A quarantined bar is
+        fetched again by later runs while it is after the stored watermark, so rows that are
+        already quarantined are skipped.
+
+        Parameters:
+        -----------
+        quarantined_data : DataFrame
+            The quarantined rows as returned by DataValidator.validate, with columns 'Open', 'High',
+            'Low', 'Close', 'Volume' and 'Failed Rules'.
+        ticker_symbol : str
+            The stock ticker symbol associated with the data.
+
+        Raises:
+        -------
+        Exception
+            If any error occurs during the insert, the transaction is rolled back, and an error is logged.
+        """
+        if quarantined_data.empty:
+            return
+
+        n_rows = len(quarantined_data)
+        columns = [
+            np.asarray(quarantined_data[name], dtype='float64').reshape(n_rows, -1)[:, 0].tolist()
+            for name in ('Open', 'High', 'Low', 'Close', 'Volume')
+        ]
+        dates = quarantined_data.index.strftime('%Y-%m-%d').tolist()
+        failed_rules = np.asarray(quarantined_data['Failed Rules']).reshape(n_rows, -1)[:, 0].tolist()
+        rows = list(zip(dates, [ticker_symbol] * n_rows, *columns, failed_rules))
+
+        conn = psycopg2.connect(**DB_PARAMS)
+        try:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO quarantined_data (date, ticker_symbol, open_price, high_price, low_price, close_price, volume, failed_rules)
+                    VALUES %s
+                    ON CONFLICT (date, ticker_symbol, failed_rules) DO NOTHING
+                """, rows)
+                conn.commit()
+            logger.info(f"Quarantined {n_rows} rows for {ticker_symbol} in the database.")
+        except Exception as e:
+            logger.error(f"Error storing quarantined data for {ticker_symbol}: {e}")
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
 
 if __name__ == "__main__":
     # Create an instance of DataIngestor
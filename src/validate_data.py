@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+from src.ingest_data import DataIngestor
+
+"""
+Here I am using Template Design Pattern for validating stock data.
+Every rule is evaluated on whole column arrays at once, the results are stacked into
+one boolean matrix and bad rows are split off in bulk.
+"""
+
+# Rules whose failing rows are quarantined, in the order of the validation mask
+VALIDATION_RULES = (
+    'non_positive_price',
+    'ohlc_inconsistent',
+    'negative_volume',
+    'duplicate_timestamp',
+)
+
+# Relative tolerance of the OHLC consistency rule. Adjusted prices are the raw prices times
+# an adjustment ratio, which can move high or low one ulp past open or close.
+OHLC_TOLERANCE = 1e-9
+
+# Rules that only flag a row, the row itself is kept. Each rule adds a boolean column.
+FLAG_RULES = {
+    'volume_spike': 'Volume Spike',
+}
+
+
+class DataValidator:
+    """
+    A class to validate stock data, quarantine rows that fail any rule and flag unusual rows.
+
+    Attributes:
+    -----------
+    volume_spike_window (int): Number of previous bars used for the median volume.
+    volume_spike_factor (float): A bar is a spike if its volume exceeds this multiple of the median.
+
+    Methods
+    -------
+    validate(stock_data: DataFrame, history: DataFrame = None) -> tuple
+        Public method that returns the clean rows, the quarantined rows and the
+        number of rows failing each rule.
+
+    _build_mask(stock_data: DataFrame, history: DataFrame = None) -> np.ndarray
+        Private method that evaluates all rules and returns a (rules x rows) boolean matrix.
+    """
+
+    def __init__(self, volume_spike_window: int = 20, volume_spike_factor: float = 10.0) -> None:
+        """
+        Initializes the DataValidator.
+
+        Args:
+            volume_spike_window (int): Number of previous bars used for the median volume.
+            volume_spike_factor (float): Multiple of the median volume above which a bar is a spike.
+        """
+        self.volume_spike_window = volume_spike_window
+        self.volume_spike_factor = volume_spike_factor
+
+    def validate(self, stock_data: pd.DataFrame, history: pd.DataFrame = None) -> tuple:
+        """
+        Public method to validate stock data.
+
+        Parameters
+        ----------
+        stock_data : DataFrame
+            The DataFrame containing stock data indexed by date.
+        history : DataFrame
+            Stored rows right before stock_data. Their volumes seed the median of the
+            volume spike rule, so that small daily batches are checked too.
+
+        Returns
+        -------
+        tuple
+            (clean_data, quarantined_data, report) where clean_data has a boolean column per
+            rule in FLAG_RULES, quarantined_data has an extra 'Failed Rules' column and report
+            maps each rule name to its number of failing rows.
+        """
+        logger.info("Started Data Validation")
+        mask = self._build_mask(stock_data, history)
+        quarantine_mask, flag_mask = mask[:len(VALIDATION_RULES)], mask[len(VALIDATION_RULES):]
+        bad_rows = quarantine_mask.any(axis=0)
+        report = dict(zip(VALIDATION_RULES + tuple(FLAG_RULES), mask.sum(axis=1).tolist()))
+
+        quarantined_data = stock_data[bad_rows].copy()
+        quarantined_data['Failed Rules'] = self._describe_failures(quarantine_mask[:, bad_rows])
+        clean_data = stock_data[~bad_rows].copy()
+        for column, flags in zip(FLAG_RULES.values(), flag_mask):
+            clean_data[column] = flags[~bad_rows]
+            if flags[~bad_rows].any():
+                logger.warning(f"{column} on {clean_data.index[flags[~bad_rows]].strftime('%Y-%m-%d').tolist()}")
+
+        logger.info(f"Data Validation Completed: {int(bad_rows.sum())} of {len(stock_data)} rows quarantined {report}")
+        return clean_data, quarantined_data, report
+
+    def _build_mask(self, stock_data: pd.DataFrame, history: pd.DataFrame = None) -> np.ndarray:
+        """
+        Private method to evaluate every rule on the column arrays.
+
+        NaN values never fail a rule, they are left to the MissingValueHandler.
+
+        Parameters
+        ----------
+        stock_data : DataFrame
+            The DataFrame containing stock data.
+        history : DataFrame
+            Stored rows right before stock_data, only their 'Volume' column is used.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean matrix of shape (len(VALIDATION_RULES) + len(FLAG_RULES), len(stock_data)),
+            True where a row fails a rule.
+        """
+        open_price = self._column(stock_data, 'Open')
+        high_price = self._column(stock_data, 'High')
+        low_price = self._column(stock_data, 'Low')
+        close_price = self._column(stock_data, 'Close')
+        volume = self._column(stock_data, 'Volume')
+
+        prices = np.vstack((open_price, high_price, low_price, close_price))
+        with np.errstate(invalid='ignore'):
+            non_positive_price = (prices <= 0).any(axis=0)
+            ohlc_inconsistent = (
+                (high_price < np.fmax(open_price, close_price) * (1 - OHLC_TOLERANCE))
+                | (low_price > np.fmin(open_price, close_price) * (1 + OHLC_TOLERANCE))
+            )
+            negative_volume = volume < 0
+
+            # Median of the previous bars only, so a spike is never judged against later data
+            past_volume = volume if history is None else np.concatenate((self._column(history, 'Volume'), volume))
+            median_volume = (
+                pd.Series(past_volume)
+                .shift(1)
+                .rolling(self.volume_spike_window, min_periods=self.volume_spike_window)
+                .median()
+                .to_numpy()[len(past_volume) - len(volume):]
+            )
+            volume_spike = volume > self.volume_spike_factor * median_volume
+
+        duplicate_timestamp = stock_data.index.duplicated(keep='first')
+
+        return np.vstack((
+            non_positive_price,
+            ohlc_inconsistent,
+            negative_volume,
+            duplicate_timestamp,
+            volume_spike,
+        ))
+
+    @staticmethod
+    def _column(stock_data: pd.DataFrame, name: str) -> np.ndarray:
+        """
+        Returns a price or volume column as a flat float array.
+
+        yfinance returns (Price, Ticker) column pairs, so selecting 'Close' can give a
+        single-column DataFrame instead of a Series.
+
+        Parameters
+        ----------
+        stock_data : DataFrame
+        name : str
+            The column name, e.g. 'Close'.
+
+        Returns
+        -------
+        np.ndarray
+            The column values as float64.
+        """
+        values = np.asarray(stock_data[name], dtype='float64')
+        # Index the first column instead of reshaping, so an empty frame gives an empty array
+        return values[:, 0] if values.ndim > 1 else values
+
+    @staticmethod
+    def _describe_failures(mask: np.ndarray) -> np.ndarray:
+        """
+        Builds a comma separated list of failed rules for each quarantined row.
+
+        Parameters
+        ----------
+        mask : np.ndarray
+            Boolean rule matrix restricted to the quarantined rows.
+
+        Returns
+        -------
+        np.ndarray
+            One string per quarantined row, e.g. 'ohlc_inconsistent,volume_spike'.
+        """
+        descriptions = np.full(mask.shape[1], '', dtype=object)
+        for rule, failed in zip(VALIDATION_RULES, mask):
+            descriptions[failed] += rule + ','
+        return np.array([description.rstrip(',') for description in descriptions], dtype=object)
+
+
+if __name__ == "__main__":
+    # Create an instance of DataIngestor
+    data_ingestor = DataIngestor()
+
+    # Example ticker symbol for testing
+    ticker_symbol = "AAPL"
+
+    # Ingest data for the given ticker symbol
+    stock_data = data_ingestor.ingest_data(ticker_symbol)
+
+    # Instantiate the DataValidator and validate the data
+    validator = DataValidator()
+    clean_data, quarantined_data, report = validator.validate(stock_data)
+    print(report)
+    print(quarantined_data.tail())
@@ -0,0 +1,20 @@
+from zenml import step
+from src.fetch_data import StockDataFetcher
+
+
+@step(enable_cache=False)
+def compute_cache_key_step(ticker_symbol: str) -> str:
+    """
+    Computes the cache key for ingesting the given ticker symbol.
+
+    This step is never cached itself, it only runs a single watermark query so that the
+    downstream steps can be served from the cache when no new data exists.
+
+    Parameters:
+        ticker_symbol (str): The ticker symbol of the stock (e.g. 'AAPL' for Apple).
+
+    Returns:
+        str: The cache key built from the ticker symbol, stored watermark and fetch range.
+    """
+    fetcher = StockDataFetcher(ticker_symbol)
+    return fetcher.get_cache_key()
@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional
+import pandas as pd
+from zenml import step
+from utils.config import BENCHMARK_TICKER_SYMBOL
+from utils.logger import logger
+from src.cross_sectional_features import CrossSectionalFeatureEngineer, CrossSectionalFeatureStorer
+
+
+@step(enable_cache=False)
+def cross_sectional_features_step(ticker_symbols: List[str], benchmark_symbol: str = BENCHMARK_TICKER_SYMBOL, sectors: Optional[Dict[str, str]] = None) -> None:
+    """
+    Computes cross-sectional features for every date after the last stored one using the
+    CrossSectionalFeatureEngineer class, and stores them next to processed_data.
+
+    Only dates on which every ticker of the universe and the benchmark are stored are
+    computed, later dates are left for the next run.
+
+    Parameters:
+        ticker_symbols (List[str]): Ticker symbols of the universe that has to be stored before a date is computed.
+        benchmark_symbol (str): Ticker symbol of the benchmark for betas and relative returns (e.g. 'SPY').
+        sectors (Optional[Dict[str, str]]): Mapping of ticker symbol to sector for sector relative returns.
+
+    Returns:
+        None
+    """
+    storer = CrossSectionalFeatureStorer()
+    engineer = CrossSectionalFeatureEngineer(sectors=sectors)
+
+    universe = [*ticker_symbols, benchmark_symbol]
+    last_date = storer.get_last_date_from_db()
+    end_date = storer.get_last_complete_date(universe, last_date)
+    if end_date is None:
+        logger.warning(
+            f"No new date with {benchmark_symbol} and all of {ticker_symbols} stored, "
+            "skipping Cross-Sectional Feature Engineering"
+        )
+        return
+
+    # Load only the universe's new dates plus enough history to fill the rolling window
+    returns = storer.load_returns(universe, last_date, lookback=engineer.window)
+    start_date = last_date + pd.Timedelta(days=1) if last_date else None
+
+    features = engineer.engineer(returns, benchmark_symbol, start_date, end_date)
+    storer.store(features)
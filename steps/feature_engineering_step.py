@@ -1,19 +1,30 @@
 import pandas as pd
 from zenml import step
-from src.feature_engineering import FeatureEngineer
+from materializers.stock_data_materializer import StockDataMaterializer
+from src.fetch_data import StockDataFetcher
+from src.feature_engineering import FeatureEngineer, FEATURE_CONFIG_VERSION
 
-@step
-def feature_engineering_step(stock_data: pd.DataFrame) -> pd.DataFrame:
+@step(output_materializers=StockDataMaterializer)
+def feature_engineering_step(stock_data: pd.DataFrame, ticker_symbol: str, feature_config_version: str = FEATURE_CONFIG_VERSION) -> pd.DataFrame:
     """
     Performs feature engineering on the provided stock data using the FeatureEngineer class.
 
+    The rolling windows are seeded with the rows stored right before the new data, so the
+    first new rows get complete features.
+
     Parameters:
         stock_data (pd.DataFrame): A pandas DataFrame containing the stock data to process.
+        ticker_symbol (str): The ticker symbol of the stock, used to read its stored history.
+        feature_config_version (str): Version of the feature configuration. It is part of the
+            cache key, so changing it recomputes the features of the latest fetched rows.
 
     Returns:
         pd.DataFrame: A pandas DataFrame with engineered features added or modified.
     """
     engineer = FeatureEngineer()
-    return engineer.engineer(stock_data)
+    history = None
+    if not stock_data.empty:
+        history = StockDataFetcher(ticker_symbol).get_stored_history(stock_data.index[0], limit=engineer.lookback)
+    return engineer.engineer(stock_data, history)
 
-# feature_engineering_step = step()(feature_engineering_step)
\ No newline at end of file
+# feature_engineering_step = step()(feature_engineering_step)
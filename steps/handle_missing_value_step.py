@@ -1,8 +1,9 @@
 import pandas as pd
 from zenml import step
+from materializers.stock_data_materializer import StockDataMaterializer
 from src.handle_missing_value import MissingValueHandler
 
-@step
+@step(output_materializers=StockDataMaterializer)
 def handle_missing_value_step(stock_data: pd.DataFrame) -> pd.DataFrame:
     """
     Handles missing values in the given stock data using the MissingValueHandler class.
@@ -1,15 +1,18 @@
 import pandas as pd
 from zenml import step
+from materializers.stock_data_materializer import StockDataMaterializer
 from src.ingest_data import DataIngestor
 
 
-@step
-def ingest_data_step(ticker_symbol: str) -> pd.DataFrame:
+@step(output_materializers=StockDataMaterializer)
+def ingest_data_step(ticker_symbol: str, cache_key: str) -> pd.DataFrame:
     """
     Ingests stock data for a given ticker symbol using the DataIngestor class.
 
     Parameters:
         ticker_symbol (str): The ticker symbol of the stock to ingest data for (e.g., 'TSLA' for Tesla).
+        cache_key (str): Key from compute_cache_key_step. It is not used for ingestion, it only
+            makes ZenML reuse the cached output while no new data exists for the ticker.
 
     Returns:
         pd.DataFrame: A pandas DataFrame containing the ingested stock data.
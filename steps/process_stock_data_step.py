@@ -0,0 +1,43 @@
+from zenml import step
+from src.fetch_data import StockDataFetcher
+from src.ingest_data import DataIngestor
+from src.validate_data import DataValidator
+from src.handle_missing_value import MissingValueHandler
+from src.feature_engineering import FeatureEngineer, FEATURE_CONFIG_VERSION
+from src.storing_preprocessed_data import DataStorer
+from src.rollups import DataRollup, RollupStorer
+
+
+@step
+def process_stock_data_step(ticker_symbol: str, cache_key: str, feature_config_version: str = FEATURE_CONFIG_VERSION) -> None:
+    """
+    Runs ingestion, validation, missing value handling, feature engineering, storage and rollups in a single step.
+
+    Use this instead of the individual steps when artifact lineage between them is not
+    needed, so the stock data never has to be materialized at a step boundary.
+
+    Parameters:
+        ticker_symbol (str): The ticker symbol of the stock to process (e.g., 'AAPL' for Apple).
+        cache_key (str): Key from compute_cache_key_step, only used so that ZenML skips the step
+            while no new data exists for the ticker.
+        feature_config_version (str): Version of the feature configuration, part of the cache key.
+            Stored rows engineered with another version are restated from their stored OHLCV values.
+
+    Returns:
+        None
+    """
+    stock_data = DataIngestor().ingest_data(ticker_symbol)
+    validator, engineer, storer = DataValidator(), FeatureEngineer(), DataStorer()
+    history = None
+    if not stock_data.empty:
+        # Seeds the volume spike median, the feature windows and the first rollup return
+        lookback = max(validator.volume_spike_window, engineer.lookback)
+        history = StockDataFetcher(ticker_symbol).get_stored_history(stock_data.index[0], limit=lookback)
+    stock_data, quarantined_data, _ = validator.validate(stock_data, history)
+    storer.store_quarantine(quarantined_data, ticker_symbol)
+    stock_data = MissingValueHandler().handle(stock_data)
+    stock_data = engineer.engineer(stock_data, history)
+    storer.store(stock_data, ticker_symbol, feature_config_version)
+    storer.restate_features(ticker_symbol, feature_config_version)
+    previous_close = history['Close'].iloc[-1] if history is not None and not history.empty else None
+    RollupStorer().store(DataRollup().rollup(stock_data, previous_close), ticker_symbol)
@@ -0,0 +1,25 @@
+import pandas as pd
+from zenml import step
+from src.fetch_data import StockDataFetcher
+from src.rollups import DataRollup, RollupStorer
+
+@step
+def rollup_step(stock_data: pd.DataFrame, ticker_symbol: str) -> None:
+    """
+    Aggregates the newly stored stock data to weekly and monthly bars using the DataRollup class
+    and merges them into the stored rollups.
+
+    Parameters:
+        stock_data (pd.DataFrame): A pandas DataFrame containing the processed stock data that was just stored.
+        ticker_symbol (str): The ticker symbol of the stock.
+
+    Returns:
+        None
+    """
+    previous_close = None
+    if not stock_data.empty:
+        # The close stored before the new rows is the base of the first period's return
+        history = StockDataFetcher(ticker_symbol).get_stored_history(stock_data.index[0], limit=1)
+        previous_close = history['Close'].iloc[-1] if not history.empty else None
+    rollups = DataRollup().rollup(stock_data, previous_close)
+    RollupStorer().store(rollups, ticker_symbol)
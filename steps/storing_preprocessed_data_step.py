@@ -1,20 +1,26 @@
 import pandas as pd
 from zenml import step
 from src.storing_preprocessed_data import DataStorer
+from src.feature_engineering import FEATURE_CONFIG_VERSION
 
 @step
-def storing_preprocessed_data_step(stock_data: pd.DataFrame, ticker_symbol: str) -> None:
+def storing_preprocessed_data_step(stock_data: pd.DataFrame, ticker_symbol: str, feature_config_version: str = FEATURE_CONFIG_VERSION) -> None:
     """
     Stores the preprocessed stock data for a given ticker symbol using the DataStorer class.
 
+    Rows stored by earlier runs with another feature configuration version are restated
+    from their stored OHLCV values afterwards.
+
     Parameters:
         stock_data (pd.DataFrame): A pandas DataFrame containing the preprocessed stock data to be stored.
         ticker_symbol (str): The ticker symbol of the stock, used to label or identify the stored data.
+        feature_config_version (str): Version of the feature configuration the data was engineered with.
 
     Returns:
         None
     """
     storer = DataStorer()
-    storer.store(stock_data, ticker_symbol)
+    storer.store(stock_data, ticker_symbol, feature_config_version)
+    storer.restate_features(ticker_symbol, feature_config_version)
 
 # storing_preprocessed_data_step = step()(storing_preprocessed_data_step)
\ No newline at end of file
@@ -0,0 +1,30 @@
+import pandas as pd
+from zenml import step
+from materializers.stock_data_materializer import StockDataMaterializer
+from src.fetch_data import StockDataFetcher
+from src.validate_data import DataValidator
+from src.storing_preprocessed_data import DataStorer
+
+@step(output_materializers=StockDataMaterializer)
+def validate_data_step(stock_data: pd.DataFrame, ticker_symbol: str) -> pd.DataFrame:
+    """
+    Validates the stock data using the DataValidator class and quarantines the rows that fail.
+
+    The volume spike rule compares against the volumes stored right before the new data,
+    so a daily run with a single new bar is checked as well.
+
+    Parameters:
+        stock_data (pd.DataFrame): A pandas DataFrame containing the ingested stock data.
+        ticker_symbol (str): The ticker symbol of the stock, stored with the quarantined rows.
+
+    Returns:
+        pd.DataFrame: A pandas DataFrame containing only the rows that passed every rule,
+            with a flag column per rule in FLAG_RULES.
+    """
+    validator = DataValidator()
+    history = None
+    if not stock_data.empty:
+        history = StockDataFetcher(ticker_symbol).get_stored_history(stock_data.index[0], limit=validator.volume_spike_window)
+    clean_data, quarantined_data, _ = validator.validate(stock_data, history)
+    DataStorer().store_quarantine(quarantined_data, ticker_symbol)
+    return clean_data
@@ -0,0 +1,138 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pandas as pd
+from src.cross_sectional_features import CrossSectionalFeatureEngineer, CrossSectionalFeatureStorer
+
+class TestCrossSectionalFeatureEngineer(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        benchmark = rng.normal(0, 0.01, 120)
+        self.returns = pd.DataFrame(
+            {
+                'AAPL': 1.2 * benchmark + rng.normal(0, 0.002, 120),
+                'MSFT': 1.1 * benchmark + rng.normal(0, 0.002, 120),
+                'XOM': rng.normal(0, 0.01, 120),
+                'SPY': benchmark,
+            },
+            index=pd.bdate_range('2023-01-02', periods=120),
+        )
+        self.engineer = CrossSectionalFeatureEngineer(
+            window=30, min_periods=30, cluster_threshold=0.7,
+            sectors={'AAPL': 'Technology', 'MSFT': 'Technology', 'XOM': 'Energy'},
+        )
+
+    def test_beta_and_correlation_match_pandas(self):
+        features = self.engineer.engineer(self.returns, 'SPY')
+        stocks = self.returns.drop(columns='SPY')
+
+        expected_beta = stocks.rolling(30).cov(self.returns['SPY']).div(self.returns['SPY'].rolling(30).var(), axis=0)
+        np.testing.assert_allclose(features['Beta'].unstack().to_numpy(), expected_beta.to_numpy(), equal_nan=True)
+
+        correlation = stocks.iloc[-30:].corr().to_numpy()
+        expected_average = (correlation.sum(axis=1) - 1) / 2
+        np.testing.assert_allclose(features['Average Correlation'].unstack().iloc[-1].to_numpy(), expected_average)
+
+    def test_clusters_ranks_and_relative_returns(self):
+        features = self.engineer.engineer(self.returns, 'SPY')
+        last_date = features.loc[self.returns.index[-1]]
+
+        self.assertEqual(last_date['Correlation Cluster'].tolist(), ['AAPL', 'AAPL', 'XOM'])
+        self.assertEqual(sorted(last_date['Return Rank'].tolist()), [1 / 3, 2 / 3, 1.0])
+        last_returns = self.returns.iloc[-1]
+        self.assertAlmostEqual(last_date.loc['AAPL', 'Relative Return'], last_returns['AAPL'] - last_returns['SPY'])
+        self.assertAlmostEqual(
+            last_date.loc['AAPL', 'Sector Relative Return'],
+            last_returns['AAPL'] - (last_returns['AAPL'] + last_returns['MSFT']) / 2,
+        )
+        self.assertAlmostEqual(last_date.loc['XOM', 'Sector Relative Return'], 0.0)
+
+    def test_incremental_matches_full_history(self):
+        full = self.engineer.engineer(self.returns, 'SPY')
+        start_date = self.returns.index[100]
+
+        # Only the rolling window before start_date is passed in
+        incremental = self.engineer.engineer(self.returns.iloc[100 - 30:], 'SPY', start_date)
+
+        pd.testing.assert_frame_equal(incremental, full.loc[start_date:])
+
+    def test_missing_returns_get_no_rows(self):
+        returns = self.returns.copy()
+        returns.iloc[:10, returns.columns.get_loc('XOM')] = np.nan
+
+        features = self.engineer.engineer(returns, 'SPY')
+
+        self.assertEqual(len(features.xs('XOM', level='ticker_symbol')), 110)
+
+    def test_end_date_excludes_incomplete_dates(self):
+        full = self.engineer.engineer(self.returns, 'SPY')
+        end_date = self.returns.index[-5]
+
+        # The last dates only have some tickers stored so far
+        returns = self.returns.copy()
+        returns.iloc[-4:, returns.columns.get_loc('MSFT')] = np.nan
+        features = self.engineer.engineer(returns, 'SPY', end_date=end_date)
+
+        pd.testing.assert_frame_equal(features, full.loc[:end_date])
+
+    def test_missing_benchmark(self):
+        with self.assertRaises(ValueError):
+            self.engineer.engineer(self.returns.drop(columns='SPY'), 'SPY')
+
+class TestCrossSectionalFeatureStorer(unittest.TestCase):
+
+    @patch('psycopg2.connect')
+    def test_get_last_complete_date(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (pd.Timestamp('2023-01-05').date(),)
+        mock_connect.return_value = mock_conn
+
+        last_date = CrossSectionalFeatureStorer().get_last_complete_date(['AAPL', 'SPY', 'SPY'], None)
+
+        self.assertEqual(last_date, pd.Timestamp('2023-01-05').date())
+        # Every distinct ticker has to be stored on the date
+        self.assertEqual(mock_cursor.execute.call_args[0][1], (['AAPL', 'SPY', 'SPY'], None, 2))
+
+    @patch('psycopg2.connect')
+    def test_load_returns_only_loads_the_universe(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [
+            (pd.Timestamp('2023-01-03').date(), 'AAPL', 0.01),
+            (pd.Timestamp('2023-01-03').date(), 'SPY', 0.02),
+        ]
+        mock_connect.return_value = mock_conn
+        storer = CrossSectionalFeatureStorer()
+
+        returns = storer.load_returns(['AAPL', 'SPY', 'SPY'])
+        self.assertEqual(returns.columns.tolist(), ['AAPL', 'SPY'])
+        self.assertIn("ticker_symbol = ANY(%s)", mock_cursor.execute.call_args[0][0])
+        self.assertEqual(mock_cursor.execute.call_args[0][1], (['AAPL', 'SPY'],))
+
+        end_date = pd.Timestamp('2023-01-02').date()
+        storer.load_returns(['AAPL', 'SPY'], end_date, lookback=20)
+        # The lookback dates are counted on the universe's dates too
+        self.assertEqual(mock_cursor.execute.call_args[0][0].count("ticker_symbol = ANY(%s)"), 2)
+        self.assertEqual(mock_cursor.execute.call_args[0][1], (['AAPL', 'SPY'], ['AAPL', 'SPY'], end_date, 20, end_date))
+
+    @patch('src.cross_sectional_features.execute_values')
+    @patch('psycopg2.connect')
+    def test_store_bulk_upsert(self, mock_connect, mock_execute_values):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        features = pd.DataFrame(
+            {'Beta': [1.1], 'Average Correlation': [np.nan], 'Correlation Cluster': ['AAPL'],
+             'Relative Return': [0.01], 'Sector Relative Return': [np.nan], 'Return Rank': [0.5]},
+            index=pd.MultiIndex.from_tuples([(pd.Timestamp('2023-01-02'), 'AAPL')], names=['Date', 'ticker_symbol']),
+        )
+
+        CrossSectionalFeatureStorer().store(features)
+
+        rows = mock_execute_values.call_args[0][2]
+        self.assertEqual(rows, [('2023-01-02', 'AAPL', 1.1, None, 'AAPL', 0.01, None, 0.5)])
+        mock_conn.commit.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.feature_engineering import FeatureEngineer
+from src.storing_preprocessed_data import DataStorer
+
+class TestFeatureEngineer(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = pd.bdate_range('2023-01-02', periods=30, name='Date')
+        self.stock_data = pd.DataFrame({'Close': 100 + rng.normal(0, 1, 30).cumsum()}, index=index)
+
+    def test_engineer_adds_features(self):
+        stock_data = FeatureEngineer().engineer(self.stock_data.copy())
+
+        for column in ('Return', 'Volatility', 'Moving Average'):
+            self.assertIn(column, stock_data.columns)
+        self.assertTrue(np.isnan(stock_data['Return'].iloc[0]))
+        self.assertAlmostEqual(stock_data['Moving Average'].iloc[4], self.stock_data['Close'].iloc[:5].mean())
+
+    def test_history_seeds_the_first_new_rows(self):
+        engineer = FeatureEngineer()
+        expected = engineer.engineer(self.stock_data.copy())
+
+        # Engineer the last rows on their own, seeded with the stored rows before them
+        history = self.stock_data.iloc[20 - engineer.lookback:20]
+        increment = engineer.engineer(self.stock_data.iloc[20:].copy(), history)
+
+        pd.testing.assert_frame_equal(increment, expected.iloc[20:])
+
+    def test_engineer_multiindex_columns(self):
+        # yfinance returns (Price, Ticker) column pairs
+        stock_data = self.stock_data.copy()
+        stock_data.columns = pd.MultiIndex.from_product([stock_data.columns, ['AAPL']], names=['Price', 'Ticker'])
+        stock_data = FeatureEngineer().engineer(stock_data, self.stock_data.iloc[:0])
+
+        np.testing.assert_allclose(
+            stock_data['Return'].to_numpy().ravel()[1:],
+            self.stock_data['Close'].pct_change().to_numpy()[1:],
+        )
+
+class TestRestateFeatures(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = pd.bdate_range('2023-01-02', periods=30, name='Date')
+        close = 100 + rng.normal(0, 1, 30).cumsum()
+        self.stored = pd.DataFrame(
+            {'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1000.0},
+            index=index,
+        )
+
+    @patch.object(DataStorer, 'store')
+    @patch('src.storing_preprocessed_data.StockDataFetcher.get_stored_history')
+    @patch.object(DataStorer, 'get_first_stale_date')
+    def test_restates_stored_rows_from_first_stale_date(self, mock_stale_date, mock_history, mock_store):
+        engineer = FeatureEngineer()
+        stale_date = self.stored.index[20]
+        mock_stale_date.return_value = stale_date.date()
+        mock_history.side_effect = [self.stored.iloc[20 - engineer.lookback:20], self.stored.iloc[20:]]
+
+        restated = DataStorer().restate_features("AAPL", "2")
+
+        self.assertEqual(restated, 10)
+        mock_stale_date.assert_called_once_with("AAPL", "2")
+        self.assertEqual(mock_history.call_args_list[0].kwargs, {'limit': engineer.lookback})
+        self.assertEqual(mock_history.call_args_list[1].kwargs, {'start_date': stale_date.date()})
+        # Recomputed from the stored OHLCV values, the same features as engineering the full history
+        stock_data, ticker_symbol, version = mock_store.call_args[0]
+        self.assertEqual((ticker_symbol, version), ("AAPL", "2"))
+        pd.testing.assert_frame_equal(stock_data, engineer.engineer(self.stored.copy()).iloc[20:])
+
+    @patch.object(DataStorer, 'store')
+    @patch('src.storing_preprocessed_data.StockDataFetcher.get_stored_history')
+    @patch.object(DataStorer, 'get_first_stale_date', return_value=None)
+    def test_current_rows_are_not_restated(self, mock_stale_date, mock_history, mock_store):
+        self.assertEqual(DataStorer().restate_features("AAPL", "2"), 0)
+        mock_history.assert_not_called()
+        mock_store.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,32 +7,69 @@ from src.fetch_data import (
     HistoricalFetchingStrategy,
     StockDataFetcher,
 )
+from yfinance.exceptions import YFPricesMissingError, YFRateLimitError
 
 class TestDataFetchingStrategies(unittest.TestCase):
-    
-    @patch('yfinance.download')
-    def test_max_period_fetching_strategy(self, mock_yfinance_download):
-        # Simulate yfinance data
-        mock_data = pd.DataFrame({'Close': [150, 151, 152]})
-        mock_yfinance_download.return_value = mock_data
-        
+
+    def setUp(self):
+        # Ticker.history returns the session dates in the exchange timezone
+        self.mock_data = pd.DataFrame(
+            {'Open': [149.0, 150.0], 'High': [151.0, 152.0], 'Low': [148.0, 149.0],
+             'Close': [150.0, 151.0], 'Volume': [1000.0, 1100.0]},
+            index=pd.DatetimeIndex(['2023-01-03', '2023-01-04'], name='Date').tz_localize('America/New_York'),
+        )
+        self.expected = self.mock_data.tz_localize(None)
+
+    @patch('yfinance.Ticker')
+    def test_max_period_fetching_strategy(self, mock_ticker):
+        mock_ticker.return_value.history.return_value = self.mock_data
+
         strategy = MaxPeriodFetchingStrategy()
         data = strategy.fetch("AAPL")
-        
-        mock_yfinance_download.assert_called_once_with("AAPL", period='max')
-        pd.testing.assert_frame_equal(data, mock_data)
-    
-    @patch('yfinance.download')
-    def test_historical_fetching_strategy(self, mock_yfinance_download):
-        # Simulate yfinance data
-        mock_data = pd.DataFrame({'Close': [153, 154, 155]})
-        mock_yfinance_download.return_value = mock_data
-        
+
+        mock_ticker.assert_called_once_with("AAPL")
+        mock_ticker.return_value.history.assert_called_once_with(actions=False, period='max')
+        pd.testing.assert_frame_equal(data, self.expected)
+
+    @patch('yfinance.Ticker')
+    def test_historical_fetching_strategy(self, mock_ticker):
+        mock_ticker.return_value.history.return_value = self.mock_data
+
         strategy = HistoricalFetchingStrategy()
         data = strategy.fetch("AAPL", "2023-01-01")
-        
-        mock_yfinance_download.assert_called_once_with("AAPL", start="2023-01-01")
-        pd.testing.assert_frame_equal(data, mock_data)
+
+        mock_ticker.assert_called_once_with("AAPL")
+        mock_ticker.return_value.history.assert_called_once_with(actions=False, start="2023-01-01")
+        pd.testing.assert_frame_equal(data, self.expected)
+
+    @patch('yfinance.data.YfData.get', side_effect=YFRateLimitError())
+    def test_fetch_raises_throttled_error(self, mock_get):
+        # The rate limit of the request reaches the caller instead of an empty frame
+        with self.assertRaises(YFRateLimitError):
+            MaxPeriodFetchingStrategy().fetch("AAPL")
+        with self.assertRaises(YFRateLimitError):
+            HistoricalFetchingStrategy().fetch("AAPL", "2023-01-01")
+
+    @patch('yfinance.data.YfData.get', side_effect=ConnectionError("connection reset"))
+    @patch('yfinance.Ticker._get_ticker_tz', return_value='America/New_York')
+    def test_fetch_raises_download_error(self, mock_get_ticker_tz, mock_get):
+        # yfinance logs other failures and returns an empty frame unless its exceptions are not hidden
+        with self.assertRaises(ConnectionError):
+            HistoricalFetchingStrategy().fetch("XXXX", "2023-01-01")
+
+    @patch('yfinance.Ticker')
+    def test_fetch_empty_result(self, mock_ticker):
+        # A ticker without any history is an error, an empty range after a holiday is not
+        mock_ticker.return_value.history.side_effect = YFPricesMissingError("AAPL", "(1d 2023-01-02 -> )")
+        with self.assertRaises(ValueError):
+            MaxPeriodFetchingStrategy().fetch("AAPL")
+        self.assertTrue(HistoricalFetchingStrategy().fetch("AAPL", "2023-01-02").empty)
+
+        mock_ticker.return_value.history.side_effect = None
+        mock_ticker.return_value.history.return_value = self.mock_data.iloc[:0]
+        with self.assertRaises(ValueError):
+            MaxPeriodFetchingStrategy().fetch("AAPL")
+        self.assertTrue(HistoricalFetchingStrategy().fetch("AAPL", "2023-01-02").empty)
 
 class TestStockDataFetcher(unittest.TestCase):
     
@@ -94,5 +131,79 @@ class TestStockDataFetcher(unittest.TestCase):
         pd.testing.assert_frame_equal(data, mock_max_data)
         mock_max_fetch.assert_called_once_with("AAPL")
 
+    @patch('src.fetch_data.HistoricalFetchingStrategy.fetch')
+    @patch('src.fetch_data.StockDataFetcher.get_last_session_date')
+    @patch('src.fetch_data.StockDataFetcher.get_last_date_from_db')
+    def test_fetch_data_without_new_sessions(self, mock_last_date, mock_last_session, mock_hist_fetch):
+        # Watermark already covers the last trading session
+        mock_last_date.return_value = datetime(2023, 1, 6)
+        mock_last_session.return_value = pd.Timestamp('2023-01-06')
+
+        fetcher = StockDataFetcher("AAPL")
+        data = fetcher.fetch_data()
+
+        self.assertTrue(data.empty)
+        self.assertIn('Close', data.columns)
+        mock_hist_fetch.assert_not_called()
+
+    @patch('psycopg2.connect')
+    def test_get_stored_history(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        # Rows come back newest first
+        mock_cursor.fetchall.return_value = [
+            (datetime(2023, 1, 4).date(), 2.0, 2.5, 1.5, 2.2, 200),
+            (datetime(2023, 1, 3).date(), 1.0, 1.5, 0.5, 1.2, 100),
+        ]
+        mock_connect.return_value = mock_conn
+
+        history = StockDataFetcher("AAPL").get_stored_history(pd.Timestamp('2023-01-05'), limit=2)
+
+        self.assertEqual(list(history.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+        self.assertEqual(list(history.index), [pd.Timestamp('2023-01-03'), pd.Timestamp('2023-01-04')])
+        self.assertEqual(history['Close'].tolist(), [1.2, 2.2])
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ("AAPL", '2023-01-05', None, 2))
+
+    def test_get_last_session_date(self):
+        fetcher = StockDataFetcher("AAPL")
+        # Wednesday before the close: today's bar is not complete yet
+        self.assertEqual(
+            fetcher.get_last_session_date(pd.Timestamp('2023-01-04 10:00', tz='America/New_York')),
+            pd.Timestamp('2023-01-03'),
+        )
+        # Wednesday after the close, given in UTC
+        self.assertEqual(
+            fetcher.get_last_session_date(pd.Timestamp('2023-01-04 21:30', tz='UTC')),
+            pd.Timestamp('2023-01-04'),
+        )
+        # Monday before the close rolls back over the weekend
+        self.assertEqual(
+            fetcher.get_last_session_date(pd.Timestamp('2023-01-09 09:00', tz='America/New_York')),
+            pd.Timestamp('2023-01-06'),
+        )
+        self.assertEqual(
+            fetcher.get_last_session_date(pd.Timestamp('2023-01-07 18:00', tz='America/New_York')),
+            pd.Timestamp('2023-01-06'),
+        )
+
+    @patch('src.fetch_data.StockDataFetcher.get_last_session_date')
+    @patch('src.fetch_data.StockDataFetcher.get_last_date_from_db')
+    def test_get_cache_key(self, mock_last_date, mock_last_session):
+        mock_last_date.return_value = datetime(2023, 1, 5)
+        mock_last_session.return_value = pd.Timestamp('2023-01-06')
+        fetcher = StockDataFetcher("AAPL")
+
+        key = fetcher.get_cache_key()
+        self.assertTrue(key.startswith("AAPL|2023-01-05|"))
+        self.assertEqual(key, fetcher.get_cache_key())
+
+        # A new session changes the fetch range and therefore the key
+        mock_last_session.return_value = pd.Timestamp('2023-01-09')
+        self.assertNotEqual(key, fetcher.get_cache_key())
+
+        # Once the watermark catches up the key changes again
+        mock_last_date.return_value = datetime(2023, 1, 9)
+        self.assertNotIn("2023-01-05", fetcher.get_cache_key())
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,156 @@
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+import pandas as pd
+from src.fetch_data import DataFetchingStrategy
+from src.fetch_executor import FetchExecutor, FetchError, ThrottledError, TokenBucket
+from src.ingest_data import DataIngestor
+
+class StubProvider(DataFetchingStrategy):
+    """
+    Local stand-in for a data provider that simulates latency and throttling.
+    """
+
+    def __init__(self, latency=0.0, throttle_first=0, fail_tickers=()):
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.fail_tickers = set(fail_tickers)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker_symbol, *args):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if call <= self.throttle_first:
+                raise ThrottledError("429 Too Many Requests")
+            if ticker_symbol in self.fail_tickers:
+                raise ValueError(f"Unknown ticker {ticker_symbol}")
+            return pd.DataFrame({'Close': [150.0]}, index=pd.to_datetime(['2023-01-02']))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+class TestFetchExecutor(unittest.TestCase):
+
+    def make_executor(self, **kwargs):
+        options = dict(rate=1000, max_concurrency=4, initial_concurrency=4, retries=3, timeout=1.0, backoff=0.001)
+        options.update(kwargs)
+        return FetchExecutor(**options)
+
+    def test_retries_throttled_requests_and_backs_off(self):
+        provider = StubProvider(throttle_first=2)
+        with self.make_executor() as executor:
+            data = executor.fetch(provider, "AAPL")
+
+            self.assertEqual(len(data), 1)
+            self.assertEqual(provider.calls, 3)
+            # Halved twice from 4 to 1, then grown by 1/limit on the success
+            self.assertEqual(executor.concurrency_limiter.limit, 2.0)
+
+    def test_gives_up_after_retries(self):
+        provider = StubProvider(fail_tickers=["XXXX"])
+        with self.make_executor(retries=2) as executor:
+            with self.assertRaises(FetchError) as context:
+                executor.fetch(provider, "XXXX")
+
+        self.assertEqual(context.exception.ticker_symbol, "XXXX")
+        self.assertEqual(provider.calls, 3)
+
+    def test_times_out_slow_requests(self):
+        provider = StubProvider(latency=0.5)
+        with self.make_executor(timeout=0.05, retries=1) as executor:
+            with self.assertRaises(FetchError) as context:
+                executor.fetch(provider, "AAPL")
+
+        self.assertIsInstance(context.exception.__cause__, TimeoutError)
+
+    def test_timed_out_request_keeps_its_slot(self):
+        # The abandoned first attempt is still running when the retry starts
+        provider = StubProvider(latency=0.3)
+        with self.make_executor(max_concurrency=1, initial_concurrency=1, timeout=0.05, retries=1) as executor:
+            with self.assertRaises(FetchError):
+                executor.fetch(provider, "AAPL")
+
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(provider.max_in_flight, 1)
+
+    def test_coalesces_duplicate_requests(self):
+        provider = StubProvider(latency=0.1)
+        with self.make_executor() as executor:
+            futures = [executor.submit(provider, "AAPL", "2023-01-01") for _ in range(5)]
+            other = executor.submit(provider, "AAPL", "2023-02-01")
+            results = [future.result() for future in futures + [other]]
+
+        self.assertIs(futures[0], futures[4])
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(len(results), 6)
+
+    def test_submit_with_already_finished_fetch(self):
+        done = Future()
+        done.set_result(pd.DataFrame())
+        with self.make_executor() as executor:
+            with patch.object(executor._pool, 'submit', return_value=done):
+                # Runs _forget inside submit, which must not wait for submit's own lock
+                submitter = threading.Thread(target=executor.submit, args=(StubProvider(), "AAPL"), daemon=True)
+                submitter.start()
+                submitter.join(timeout=1.0)
+
+            self.assertFalse(submitter.is_alive())
+            self.assertEqual(executor._pending, {})
+
+    def test_limits_concurrency(self):
+        provider = StubProvider(latency=0.05)
+        with self.make_executor(max_concurrency=3, initial_concurrency=2) as executor:
+            futures = [executor.submit(provider, f"T{i}") for i in range(12)]
+            for future in futures:
+                future.result()
+
+        self.assertLessEqual(provider.max_in_flight, 3)
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        # First token is available immediately, the next 10 take 1/50 s each
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+class TestIngestMany(unittest.TestCase):
+
+    @patch('src.fetch_data.StockDataFetcher.get_last_date_from_db', return_value=None)
+    @patch('src.fetch_data.MaxPeriodFetchingStrategy.fetch')
+    def test_ingest_many_reports_failed_tickers(self, mock_max_fetch, mock_last_date):
+        def fetch(ticker_symbol):
+            if ticker_symbol == "XXXX":
+                raise ValueError("Unknown ticker")
+            return pd.DataFrame({'Close': [150.0]})
+        mock_max_fetch.side_effect = fetch
+        executor = FetchExecutor(rate=1000, retries=1, backoff=0.001)
+
+        with self.assertRaises(FetchError) as context:
+            DataIngestor().ingest_many(["AAPL", "XXXX", "AAPL"], executor)
+        executor.shutdown()
+
+        self.assertEqual(context.exception.ticker_symbol, "XXXX")
+        self.assertEqual(mock_max_fetch.call_count, 3)
+
+    @patch('src.fetch_data.StockDataFetcher.get_last_date_from_db', return_value=None)
+    @patch('src.fetch_data.MaxPeriodFetchingStrategy.fetch')
+    def test_ingest_many(self, mock_max_fetch, mock_last_date):
+        mock_max_fetch.return_value = pd.DataFrame({'Close': [150.0]})
+
+        stock_data = DataIngestor().ingest_many(["AAPL", "MSFT"])
+
+        self.assertEqual(set(stock_data), {"AAPL", "MSFT"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.handle_missing_value import MissingValueHandler
+
+class TestMissingValueHandler(unittest.TestCase):
+
+    def test_handle_forward_fills_without_future_values(self):
+        stock_data = pd.DataFrame(
+            {'Close': [np.nan, 150.0, np.nan, 152.0]},
+            index=pd.to_datetime(['2023-01-02', '2023-01-03', '2023-01-04', '2023-01-05']),
+        )
+
+        result = MissingValueHandler().handle(stock_data)
+
+        # The leading row has no earlier value and is dropped instead of back filled
+        expected = pd.DataFrame(
+            {'Close': [150.0, 150.0, 152.0]},
+            index=pd.to_datetime(['2023-01-03', '2023-01-04', '2023-01-05']),
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+from unittest.mock import patch, MagicMock
+import numpy as np
+from src.local_mirror import LocalMirror, MIRROR_COLUMNS
+
+def make_rows(days, close_start=150.0, updated_at=None):
+    updated_at = updated_at or datetime(2023, 1, days[-1], 22, tzinfo=timezone.utc)
+    return [
+        (date(2023, 1, day), 149.0, 151.0, 148.0, close_start + i, 1000.0, None, 0.01, 0.001, updated_at)
+        for i, day in enumerate(days)
+    ]
+
+class TestLocalMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mirror = LocalMirror(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def mock_db(self, mock_connect, fetch_results):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.side_effect = fetch_results
+        mock_connect.return_value = mock_conn
+        return mock_cursor
+
+    @patch('psycopg2.connect')
+    def test_sync_is_incremental(self, mock_connect):
+        mock_cursor = self.mock_db(mock_connect, [make_rows([2, 3, 4])])
+        self.assertEqual(self.mirror.sync(["AAPL"]), {"AAPL": 3})
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ("AAPL", "AAPL", None, None))
+
+        mock_cursor = self.mock_db(mock_connect, [make_rows([5, 6], close_start=153.0)])
+        self.assertEqual(self.mirror.sync(["AAPL"]), {"AAPL": 2})
+        # Second sync only asks for rows after the local watermark or written after the last sync
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ("AAPL", "AAPL", "2023-01-04", "2023-01-04T22:00:00+00:00"))
+
+        columns = self.mirror.load("AAPL")
+        self.assertEqual(set(columns), {'date'} | set(MIRROR_COLUMNS))
+        np.testing.assert_array_equal(columns['close_price'], [150.0, 151.0, 152.0, 153.0, 154.0])
+        self.assertTrue(np.isnan(columns['moving_average']).all())
+
+    @patch('psycopg2.connect')
+    def test_sync_rewrites_overwritten_rows(self, mock_connect):
+        self.mock_db(mock_connect, [make_rows([2, 3, 4, 5])])
+        self.mirror.sync(["AAPL"])
+
+        # Rows from 2023-01-03 on were restated in the database after the last sync
+        restated_at = datetime(2023, 1, 6, 22, tzinfo=timezone.utc)
+        self.mock_db(mock_connect, [make_rows([3, 4, 5, 6], close_start=251.0, updated_at=restated_at)])
+        self.assertEqual(self.mirror.sync(["AAPL"]), {"AAPL": 4})
+
+        columns = self.mirror.load("AAPL")
+        np.testing.assert_array_equal(columns['date'], np.arange('2023-01-02', '2023-01-07', dtype='datetime64[D]'))
+        np.testing.assert_array_equal(columns['close_price'], [150.0, 251.0, 252.0, 253.0, 254.0])
+        self.assertEqual(self.mirror._read_meta("AAPL"), {'rows': 5, 'updated_at': restated_at.isoformat()})
+
+    @patch('psycopg2.connect')
+    def test_sync_all_tickers(self, mock_connect):
+        self.mock_db(mock_connect, [[("AAPL",), ("MSFT",)], make_rows([2]), []])
+
+        self.assertEqual(self.mirror.sync(), {"AAPL": 1, "MSFT": 0})
+        self.assertIsNone(self.mirror.get_watermark("MSFT"))
+
+    @patch('psycopg2.connect')
+    def test_load_date_slice_is_memory_mapped(self, mock_connect):
+        self.mock_db(mock_connect, [make_rows([2, 3, 4, 5, 6])])
+        self.mirror.sync(["AAPL"])
+
+        columns = self.mirror.load("AAPL", start_date='2023-01-03', end_date='2023-01-05')
+
+        np.testing.assert_array_equal(columns['date'], np.array(['2023-01-03', '2023-01-04', '2023-01-05'], dtype='datetime64[D]'))
+        np.testing.assert_array_equal(columns['close_price'], [151.0, 152.0, 153.0])
+        self.assertIsInstance(columns['close_price'].base, np.memmap)
+        self.assertFalse(columns['close_price'].flags.writeable)
+
+    @patch('psycopg2.connect')
+    def test_interrupted_append_is_discarded(self, mock_connect):
+        self.mock_db(mock_connect, [make_rows([2, 3])])
+        self.mirror.sync(["AAPL"])
+        # Simulate a crash after writing a column but before recording the row count
+        with open(os.path.join(self.tmp_dir.name, "AAPL", "close_price.bin"), 'ab') as f:
+            f.write(np.array([999.0]).tobytes())
+
+        self.mock_db(mock_connect, [make_rows([4], close_start=152.0)])
+        self.mirror.sync(["AAPL"])
+
+        np.testing.assert_array_equal(self.mirror.load("AAPL")['close_price'], [150.0, 151.0, 152.0])
+
+    def test_load_unknown_ticker(self):
+        columns = self.mirror.load("XXXX")
+        self.assertEqual(len(columns['date']), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pandas as pd
+from src.feature_engineering import FeatureEngineer
+from src.rollups import DataRollup, RollupStorer, ROLLUP_COLUMNS
+
+class TestDataRollup(unittest.TestCase):
+
+    def setUp(self):
+        # Two weeks of bars, Monday 2023-01-30 to Friday 2023-02-10, spanning two months
+        index = pd.bdate_range('2023-01-30', periods=10)
+        close = np.arange(100.0, 110.0)
+        self.stock_data = pd.DataFrame(
+            {
+                'Open': close - 0.5,
+                'High': close + 1.0,
+                'Low': close - 1.0,
+                'Close': close,
+                'Volume': np.full(10, 1000.0),
+                'Moving Average': close - 2.0,
+                'Volatility': [np.nan] + [0.01] * 9,
+                'Return': [np.nan] + list(close[1:] / close[:-1] - 1),
+            },
+            index=index,
+        )
+
+    def test_rollup_weekly_and_monthly(self):
+        rollups = DataRollup().rollup(self.stock_data, previous_close=99.0)
+        weekly, monthly = rollups['weekly'], rollups['monthly']
+
+        self.assertEqual(list(weekly.columns), ROLLUP_COLUMNS)
+        self.assertEqual(weekly.index.tolist(), [pd.Timestamp('2023-01-30'), pd.Timestamp('2023-02-06')])
+        first_week = weekly.iloc[0]
+        self.assertEqual(first_week['open_price'], 99.5)
+        self.assertEqual(first_week['high_price'], 105.0)
+        self.assertEqual(first_week['low_price'], 99.0)
+        self.assertEqual(first_week['close_price'], 104.0)
+        self.assertEqual(first_week['volume'], 5000.0)
+        self.assertEqual(first_week['bar_count'], 5)
+        self.assertEqual(first_week['volatility_count'], 4)
+        self.assertEqual(first_week['prev_close'], 99.0)
+        self.assertAlmostEqual(first_week['period_return'], 104.0 / 99.0 - 1)
+        self.assertEqual(weekly.iloc[1]['prev_close'], 104.0)
+
+        self.assertEqual(monthly.index.tolist(), [pd.Timestamp('2023-01-01'), pd.Timestamp('2023-02-01')])
+        self.assertEqual(monthly['bar_count'].tolist(), [2, 8])
+        self.assertAlmostEqual(monthly.iloc[1]['period_return'], 109.0 / 101.0 - 1)
+
+    def test_rollup_batches_merge_to_full_period(self):
+        # Split the second week in two batches, each engineered the way the pipeline does it
+        raw = self.stock_data[['Open', 'High', 'Low', 'Close', 'Volume']]
+        engineer = FeatureEngineer()
+        full = DataRollup().rollup(engineer.engineer(raw.copy()), 99.0)['weekly'].iloc[1]
+        first_batch = engineer.engineer(raw.iloc[:7].copy())
+        second_batch = engineer.engineer(raw.iloc[7:].copy(), history=raw.iloc[:7])
+        first = DataRollup().rollup(first_batch, 99.0)['weekly'].iloc[1]
+        second = DataRollup().rollup(second_batch, raw['Close'].iloc[6])['weekly'].iloc[0]
+
+        # Merged the way RollupStorer.store merges into the stored period
+        self.assertGreater(second['first_date'], first['last_date'])
+        self.assertAlmostEqual(second['close_price'] / first['prev_close'] - 1, full['period_return'])
+        self.assertEqual(max(first['high_price'], second['high_price']), full['high_price'])
+        self.assertEqual(first['volume'] + second['volume'], full['volume'])
+        self.assertAlmostEqual(first['volatility_sum'] + second['volatility_sum'], full['volatility_sum'])
+        self.assertEqual(first['volatility_count'] + second['volatility_count'], full['volatility_count'])
+
+    def test_rollup_empty_frame(self):
+        # Runs without new bars pass an empty frame, possibly with (Price, Ticker) columns
+        stock_data = self.stock_data.iloc[:0].copy()
+        stock_data.columns = pd.MultiIndex.from_product([stock_data.columns, ['AAPL']])
+
+        rollups = DataRollup().rollup(stock_data)
+
+        self.assertTrue(rollups['weekly'].empty)
+        self.assertTrue(rollups['monthly'].empty)
+
+class TestRollupStorer(unittest.TestCase):
+
+    @patch('src.rollups.execute_values')
+    @patch('psycopg2.connect')
+    def test_store_bulk_upsert(self, mock_connect, mock_execute_values):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        stock_data = pd.DataFrame(
+            {'Open': [1.0], 'High': [2.0], 'Low': [0.5], 'Close': [1.5], 'Volume': [10.0],
+             'Moving Average': [np.nan], 'Volatility': [np.nan], 'Return': [np.nan]},
+            index=pd.to_datetime(['2023-02-01']),
+        )
+
+        RollupStorer().store(DataRollup().rollup(stock_data), "AAPL")
+
+        rows = mock_execute_values.call_args[0][2]
+        # Without a stored close before the first bar the return is unknown, not zero
+        self.assertEqual(rows, [
+            ('weekly', 'AAPL', '2023-01-30', '2023-02-01', '2023-02-01', 1.0, 2.0, 0.5, 1.5, None, 10.0, 1, None, 0.0, 0, None),
+            ('monthly', 'AAPL', '2023-02-01', '2023-02-01', '2023-02-01', 1.0, 2.0, 0.5, 1.5, None, 10.0, 1, None, 0.0, 0, None),
+        ])
+        self.assertIn("period_return = EXCLUDED.close_price / r.prev_close - 1", mock_execute_values.call_args[0][1])
+        mock_conn.commit.assert_called_once()
+
+    @patch('psycopg2.connect')
+    def test_store_empty_rollups(self, mock_connect):
+        RollupStorer().store(DataRollup().rollup(pd.DataFrame(columns=[
+            'Open', 'High', 'Low', 'Close', 'Volume', 'Moving Average', 'Volatility', 'Return',
+        ], index=pd.DatetimeIndex([]))), "AAPL")
+        mock_connect.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import pyarrow as pa
+from materializers.stock_data_materializer import StockDataMaterializer, ARROW_FILENAME
+
+class TestStockDataMaterializer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.stock_data = pd.DataFrame(
+            {
+                'Open': [150.0, 151.0, 152.0],
+                'Close': [151.0, 152.0, 153.0],
+                'Volume': [1000, 1100, 1200],
+            },
+            index=pd.to_datetime(['2023-01-02', '2023-01-03', '2023-01-04']).rename('Date'),
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load_round_trip(self):
+        materializer = StockDataMaterializer(self.tmp_dir.name)
+        materializer.save(self.stock_data)
+
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, ARROW_FILENAME)))
+        loaded = materializer.load(pd.DataFrame)
+        pd.testing.assert_frame_equal(loaded, self.stock_data, check_freq=False)
+
+    def test_round_trip_multiindex_columns(self):
+        # yfinance returns (Price, Ticker) column pairs
+        stock_data = self.stock_data.copy()
+        stock_data.columns = pd.MultiIndex.from_product(
+            [stock_data.columns, ['AAPL']], names=['Price', 'Ticker']
+        )
+        materializer = StockDataMaterializer(self.tmp_dir.name)
+        materializer.save(stock_data)
+
+        loaded = materializer.load(pd.DataFrame)
+        pd.testing.assert_frame_equal(loaded, stock_data, check_freq=False)
+
+    def test_load_closes_memory_map(self):
+        materializer = StockDataMaterializer(self.tmp_dir.name)
+        materializer.save(self.stock_data)
+
+        sources = []
+        open_memory_map = pa.memory_map
+        def memory_map(*args):
+            sources.append(open_memory_map(*args))
+            return sources[-1]
+
+        with patch('materializers.stock_data_materializer.pa.memory_map', side_effect=memory_map):
+            loaded = materializer.load(pd.DataFrame)
+
+        self.assertTrue(sources[0].closed)
+        # The columns still read from the mapping after the handle is closed
+        pd.testing.assert_frame_equal(loaded, self.stock_data, check_freq=False)
+
+    def test_load_maps_columns_with_nan(self):
+        # Features always start with NaN, they must not become nulls that force a copy
+        stock_data = self.stock_data.copy()
+        stock_data['Return'] = stock_data['Close'].pct_change()
+        materializer = StockDataMaterializer(self.tmp_dir.name)
+        materializer.save(stock_data)
+
+        mapped = []
+        open_memory_map = pa.memory_map
+        def memory_map(*args):
+            source = open_memory_map(*args)
+            mapped.append(source.read_buffer())
+            source.seek(0)
+            return source
+
+        with patch('materializers.stock_data_materializer.pa.memory_map', side_effect=memory_map):
+            loaded = materializer.load(pd.DataFrame)
+
+        address = loaded['Return'].to_numpy().__array_interface__['data'][0]
+        self.assertTrue(mapped[0].address <= address < mapped[0].address + mapped[0].size)
+        pd.testing.assert_frame_equal(loaded, stock_data, check_freq=False)
+
+    def test_compute_content_hash(self):
+        materializer = StockDataMaterializer(self.tmp_dir.name)
+        content_hash = materializer.compute_content_hash(self.stock_data)
+
+        self.assertEqual(content_hash, materializer.compute_content_hash(self.stock_data.copy()))
+        changed = self.stock_data.copy()
+        changed.iloc[0, 0] = 149.0
+        self.assertNotEqual(content_hash, materializer.compute_content_hash(changed))
+
+if __name__ == "__main__":
+    unittest.main()
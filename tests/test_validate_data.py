@@ -0,0 +1,177 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pandas as pd
+from yfinance.utils import auto_adjust
+from src.validate_data import DataValidator, VALIDATION_RULES, FLAG_RULES
+from src.fetch_data import StockDataFetcher
+from src.storing_preprocessed_data import DataStorer
+
+class TestDataValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.stock_data = pd.DataFrame(
+            {
+                'Open': [100.0, 101.0, 102.0, 103.0],
+                'High': [102.0, 103.0, 104.0, 105.0],
+                'Low': [99.0, 100.0, 101.0, 102.0],
+                'Close': [101.0, 102.0, 103.0, 104.0],
+                'Volume': [1000.0, 1100.0, 1200.0, 1300.0],
+            },
+            index=pd.to_datetime(['2023-01-02', '2023-01-03', '2023-01-04', '2023-01-05']),
+        )
+
+    def test_validate_clean_data(self):
+        clean_data, quarantined_data, report = DataValidator().validate(self.stock_data)
+
+        pd.testing.assert_frame_equal(clean_data.drop(columns='Volume Spike'), self.stock_data)
+        self.assertFalse(clean_data['Volume Spike'].any())
+        self.assertTrue(quarantined_data.empty)
+        self.assertEqual(report, {rule: 0 for rule in VALIDATION_RULES + tuple(FLAG_RULES)})
+
+    def test_validate_quarantines_bad_rows(self):
+        stock_data = self.stock_data.copy()
+        stock_data.iloc[0, stock_data.columns.get_loc('Close')] = 0.0      # non positive and outside Low
+        stock_data.iloc[1, stock_data.columns.get_loc('High')] = 100.5     # High below Open and Close
+        stock_data.iloc[2, stock_data.columns.get_loc('Volume')] = -5.0
+        stock_data.index = stock_data.index[:3].append(stock_data.index[2:3])  # duplicate timestamp
+
+        clean_data, quarantined_data, report = DataValidator().validate(stock_data)
+
+        self.assertTrue(clean_data.empty)
+        self.assertEqual(report['non_positive_price'], 1)
+        self.assertEqual(report['ohlc_inconsistent'], 2)
+        self.assertEqual(report['negative_volume'], 1)
+        self.assertEqual(report['duplicate_timestamp'], 1)
+        self.assertEqual(
+            quarantined_data['Failed Rules'].tolist(),
+            ['non_positive_price,ohlc_inconsistent', 'ohlc_inconsistent', 'negative_volume', 'duplicate_timestamp'],
+        )
+
+    def test_validate_keeps_auto_adjusted_bars(self):
+        # Bars that closed at their high or low, adjusted the way yf.download adjusts them
+        raw_data = pd.DataFrame(
+            {'Open': [186.86, 80.75, 186.65], 'High': [187.86, 81.75, 187.65],
+             'Low': [185.86, 79.75, 185.65], 'Close': [187.86, 81.75, 187.65],
+             'Adj Close': [111.059418, 42.756817, 102.745426], 'Volume': [1000.0, 1000.0, 1000.0]},
+            index=pd.to_datetime(['2023-01-02', '2023-01-03', '2023-01-04']),
+        )
+        stock_data = auto_adjust(raw_data)
+        # The adjusted high lands one ulp below the adjusted close
+        self.assertTrue((stock_data['High'] < stock_data['Close']).all())
+
+        clean_data, quarantined_data, report = DataValidator().validate(stock_data)
+
+        self.assertTrue(quarantined_data.empty)
+        self.assertEqual(report['ohlc_inconsistent'], 0)
+        self.assertEqual(len(clean_data), 3)
+
+    def test_validate_flags_volume_spike_using_past_bars_only(self):
+        index = pd.date_range('2023-01-02', periods=6, freq='B')
+        stock_data = pd.DataFrame(
+            {'Open': 10.0, 'High': 11.0, 'Low': 9.0, 'Close': 10.0,
+             'Volume': [100.0, 100.0, 100.0, 5000.0, 100.0, 100.0]},
+            index=index,
+        )
+        validator = DataValidator(volume_spike_window=3, volume_spike_factor=10.0)
+
+        clean_data, quarantined_data, report = validator.validate(stock_data)
+
+        # The spike is a real bar, it is flagged but kept
+        self.assertEqual(report['volume_spike'], 1)
+        self.assertTrue(quarantined_data.empty)
+        self.assertEqual(len(clean_data), 6)
+        self.assertEqual(clean_data.index[clean_data['Volume Spike']].tolist(), [index[3]])
+
+    def test_validate_volume_spike_seeded_with_history(self):
+        # A daily run has a single new bar, the median comes from the stored bars
+        history = pd.DataFrame(
+            {'Open': 10.0, 'High': 11.0, 'Low': 9.0, 'Close': 10.0, 'Volume': [100.0, 120.0, 90.0]},
+            index=pd.date_range('2023-01-02', periods=3, freq='B'),
+        )
+        stock_data = pd.DataFrame(
+            {'Open': 10.0, 'High': 11.0, 'Low': 9.0, 'Close': 10.0, 'Volume': [5000.0]},
+            index=pd.to_datetime(['2023-01-05']),
+        )
+        validator = DataValidator(volume_spike_window=3, volume_spike_factor=10.0)
+
+        clean_data, _, report = validator.validate(stock_data, history)
+        self.assertEqual(report['volume_spike'], 1)
+        self.assertTrue(clean_data['Volume Spike'].iloc[0])
+
+        # Without history there are not enough previous bars to judge the spike
+        clean_data, _, report = validator.validate(stock_data)
+        self.assertEqual(report['volume_spike'], 0)
+
+    def test_validate_ignores_missing_values(self):
+        stock_data = self.stock_data.copy()
+        stock_data.iloc[1, :] = np.nan
+
+        clean_data, quarantined_data, _ = DataValidator().validate(stock_data)
+
+        self.assertEqual(len(clean_data), 4)
+        self.assertTrue(quarantined_data.empty)
+
+    @patch('src.fetch_data.StockDataFetcher.get_last_session_date')
+    @patch('src.fetch_data.StockDataFetcher.get_last_date_from_db')
+    def test_validate_empty_fetch(self, mock_last_date, mock_last_session):
+        # The frame the fetcher returns when there is no new session
+        mock_last_date.return_value = pd.Timestamp('2023-01-06')
+        mock_last_session.return_value = pd.Timestamp('2023-01-06')
+        stock_data = StockDataFetcher("AAPL").fetch_data()
+
+        clean_data, quarantined_data, report = DataValidator().validate(stock_data)
+
+        self.assertTrue(clean_data.empty)
+        self.assertTrue(quarantined_data.empty)
+        self.assertEqual(report, {rule: 0 for rule in VALIDATION_RULES + tuple(FLAG_RULES)})
+
+    def test_validate_empty_multiindex_columns(self):
+        # yfinance returns an empty (Price, Ticker) frame on holidays and failed downloads
+        stock_data = self.stock_data.iloc[:0].copy()
+        stock_data.columns = pd.MultiIndex.from_product([stock_data.columns, ['AAPL']])
+
+        clean_data, quarantined_data, _ = DataValidator().validate(stock_data)
+
+        self.assertTrue(clean_data.empty)
+        self.assertTrue(quarantined_data.empty)
+
+    def test_validate_multiindex_columns(self):
+        stock_data = self.stock_data.copy()
+        stock_data.columns = pd.MultiIndex.from_product([stock_data.columns, ['AAPL']])
+        stock_data.iloc[0, 0] = -1.0
+
+        clean_data, quarantined_data, report = DataValidator().validate(stock_data)
+
+        self.assertEqual(report['non_positive_price'], 1)
+        self.assertEqual(len(clean_data), 3)
+
+class TestStoreQuarantine(unittest.TestCase):
+
+    @patch('src.storing_preprocessed_data.execute_values')
+    @patch('psycopg2.connect')
+    def test_store_quarantine_bulk_insert(self, mock_connect, mock_execute_values):
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        quarantined_data = pd.DataFrame(
+            {'Open': [1.0], 'High': [0.5], 'Low': [0.8], 'Close': [1.0], 'Volume': [10.0],
+             'Failed Rules': ['ohlc_inconsistent']},
+            index=pd.to_datetime(['2023-01-02']),
+        )
+
+        DataStorer().store_quarantine(quarantined_data, "AAPL")
+
+        mock_execute_values.assert_called_once()
+        rows = mock_execute_values.call_args[0][2]
+        self.assertEqual(rows, [('2023-01-02', 'AAPL', 1.0, 0.5, 0.8, 1.0, 10.0, 'ohlc_inconsistent')])
+        # Bars quarantined by an earlier run are fetched again and must not be duplicated
+        self.assertIn("ON CONFLICT (date, ticker_symbol, failed_rules) DO NOTHING", mock_execute_values.call_args[0][1])
+        mock_conn.commit.assert_called_once()
+
+    @patch('psycopg2.connect')
+    def test_store_quarantine_empty(self, mock_connect):
+        DataStorer().store_quarantine(pd.DataFrame(columns=['Failed Rules']), "AAPL")
+        mock_connect.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -19,3 +20,15 @@ DATABASE_CONFIG = {
 
 MLFLOW_TRACKING_URI = "http://localhost:5000"
 
+# Comma separated ticker symbols ingested by the pipeline
+TICKER_SYMBOLS = os.getenv('TICKER_SYMBOLS', 'AAPL').split(',')
+
+# Benchmark the cross-sectional features (beta, relative returns) are computed against.
+# The pipeline ingests it together with TICKER_SYMBOLS.
+BENCHMARK_TICKER_SYMBOL = os.getenv('BENCHMARK_TICKER_SYMBOL', 'SPY')
+
+# JSON mapping of ticker symbol to sector used for sector relative returns, e.g. '{"AAPL": "Technology"}'
+TICKER_SECTORS = json.loads(os.getenv('TICKER_SECTORS', '{}'))
+
+# Directory of the local columnar mirror of processed_data used by research jobs
+LOCAL_MIRROR_PATH = os.getenv('LOCAL_MIRROR_PATH', os.path.expanduser('~/.hft_pipeline/processed_data'))